@@ -1,5 +1,7 @@
 # Section D: Modularization with Functions
 
+import bisect
+
 # Subjects to track
 subjects = ["Math", "English", "Science"]
 
@@ -7,6 +9,10 @@ subjects = ["Math", "English", "Science"]
 # Format: { "Student Name": {"Math": 90, "English": 80, "Science": 70} }
 students = {}
 
+# Subject-major index over the same data, kept in sync with students
+# Format: { "Math": [(45, "Ann Lee"), (90, "Bob Ray")] } - each list sorted by (mark, name)
+subject_index = {subject: [] for subject in subjects}
+
 # ---------------- Helper Functions ----------------
 def get_average(grades):
     """Calculate and return average marks"""
@@ -22,6 +28,44 @@ def display_student(name, grades):
         print(f"  {subject}: {mark}")
     print(f"  Average: {avg:.2f}")
 
+# ---------------- Subject Index ----------------
+def index_grade(name, subject, mark):
+    """Insert one (mark, name) entry into the subject's sorted list"""
+    bisect.insort(subject_index.setdefault(subject, []), (mark, name))
+
+def unindex_grade(name, subject, mark):
+    """Remove one (mark, name) entry from the subject's sorted list"""
+    entries = subject_index[subject]
+    position = bisect.bisect_left(entries, (mark, name))
+    if position < len(entries) and entries[position] == (mark, name):
+        del entries[position]
+
+def index_student(name, grades):
+    """Add all of a student's grades to the subject index"""
+    for subject, mark in grades.items():
+        index_grade(name, subject, mark)
+
+def unindex_student(name, grades):
+    """Remove all of a student's grades from the subject index"""
+    for subject, mark in grades.items():
+        unindex_grade(name, subject, mark)
+
+def students_in_range(subject, low, high):
+    """Return (mark, name) entries with low <= mark <= high, lowest mark first"""
+    entries = subject_index.get(subject, [])
+    start = bisect.bisect_left(entries, (low,))
+    end = bisect.bisect_left(entries, (high + 1,))
+    return entries[start:end]
+
+def highest_and_lowest(subject):
+    """Return (highest entries, lowest entries) for a subject - ties are all included"""
+    entries = subject_index.get(subject, [])
+    if not entries:
+        return [], []
+    highest = students_in_range(subject, entries[-1][0], entries[-1][0])
+    lowest = students_in_range(subject, entries[0][0], entries[0][0])
+    return highest, lowest
+
 # ---------------- Core Functions ----------------
 def add_student():
     """Add a new student with their grades"""
@@ -48,6 +92,7 @@ def add_student():
                     print("Invalid input. Please enter a number.")
 
         students[student_name] = grades
+        index_student(student_name, grades)
         print(f"{student_name} added successfully!")
 
     except Exception as e:
@@ -84,7 +129,11 @@ def update_student():
                 try:
                     new_mark = int(new_mark)
                     if 0 <= new_mark <= 100:
+                        old_mark = students[student_name].get(subject)
+                        if old_mark is not None:
+                            unindex_grade(student_name, subject, old_mark)
                         students[student_name][subject] = new_mark
+                        index_grade(student_name, subject, new_mark)
                     else:
                         print("Invalid mark. Skipped update for this subject.")
                 except ValueError:
@@ -99,6 +148,7 @@ def remove_student():
     try:
         student_name = input("Enter the name of the student to remove: ").strip()
         if student_name in students:
+            unindex_student(student_name, students[student_name])
             del students[student_name]
             print(f"{student_name} removed successfully!")
         else:
@@ -127,15 +177,42 @@ def view_subject_grades():
             print("Invalid subject.")
             return
 
-        print(f"\n--- {subject} Grades ---")
-        if not students:
+        print(f"\n--- {subject} Grades (Highest First) ---")
+        if not subject_index[subject]:
             print("No students in the system.")
             return
-        for name, grades in students.items():
-            print(f"{name}: {grades[subject]}")
+        for mark, name in reversed(subject_index[subject]):
+            print(f"{name}: {mark}")
+
+        highest, lowest = highest_and_lowest(subject)
+        print(f"Highest: {highest[0][0]} ({', '.join(name for _, name in highest)})")
+        print(f"Lowest: {lowest[0][0]} ({', '.join(name for _, name in lowest)})")
     except Exception as e:
         print(f"Error viewing subject grades: {e}")
 
+def search_by_mark_range():
+    """List students whose mark in one subject falls within a range"""
+    try:
+        subject = input(f"Enter subject ({', '.join(subjects)}): ").strip()
+        if subject not in subjects:
+            print("Invalid subject.")
+            return
+
+        low = int(input("Enter lowest mark (0–100): "))
+        high = int(input("Enter highest mark (0–100): "))
+        matches = students_in_range(subject, low, high)
+
+        print(f"\n--- {subject} Marks from {low} to {high} ---")
+        if not matches:
+            print("No students found in that range.")
+            return
+        for mark, name in matches:
+            print(f"{name}: {mark}")
+    except ValueError:
+        print("Invalid input. Please enter a number.")
+    except Exception as e:
+        print(f"Error searching by mark range: {e}")
+
 # ---------------- Main Menu ----------------
 def main_menu():
     """Main control flow for the Student Management System"""
@@ -147,9 +224,10 @@ def main_menu():
         print("4. View All Students")
         print("5. View Subject Grades")
         print("6. Search for a Student")
-        print("7. Exit")
+        print("7. Find Students by Mark Range")
+        print("8. Exit")
 
-        choice = input("Choose an option (1–7): ").strip()
+        choice = input("Choose an option (1–8): ").strip()
 
         if choice == "1":
             add_student()
@@ -164,6 +242,8 @@ def main_menu():
         elif choice == "6":
             search_student()
         elif choice == "7":
+            search_by_mark_range()
+        elif choice == "8":
             print("Exiting program...")
             break
         else:
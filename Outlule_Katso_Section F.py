@@ -50,6 +50,7 @@ EDGE CASES TESTED:
 6. Case sensitivity in searches
 7. Empty string inputs
 8. Very large student lists (performance)
+9. Queries on an empty roster and empty search text (e.g. name ~ "")
 
 ISSUES ENCOUNTERED AND RESOLUTIONS:
 -----------------------------------
@@ -71,6 +72,10 @@ ISSUES ENCOUNTERED AND RESOLUTIONS:
 6. ISSUE: Error messages not user-friendly
    RESOLUTION: Enhanced exception messages with clear guidance
 
+7. ISSUE: name ~ "" crashed with IndexError on an empty gradebook
+   RESOLUTION: Name conditions return an empty mask for an empty roster,
+   and an empty contains-text matches every student
+
 TESTING RESULTS:
 ---------------
 ✓ All core functionalities operational
@@ -89,6 +94,90 @@ The system has been verified to handle:
 - Performance with realistic data volumes
 """
 
+import bisect
+import csv
+import gc
+import gzip
+import heapq
+import io
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import zipfile
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from operator import attrgetter, itemgetter
+
+# Sorts after every character, so (text + NAME_KEY_END) bounds all names starting with text
+NAME_KEY_END = chr(0x10FFFF)
+
+# Grades are integers 0-100, so grade keys fall into this many counting-sort buckets
+GRADE_BUCKETS = 101
+
+# Key used by percentile() and histogram() for the rounded student averages
+AVERAGE_KEY = "Average"
+
+# Largest key domain for which a counting sort is used instead of a comparison sort
+MAX_COUNTING_BUCKETS = 10_000
+
+
+def letter_grade(mark):
+    """
+    Classify a mark or average into a Section A letter grade
+
+    Args:
+        mark (float): Mark or average between 0 and 100
+
+    Returns:
+        str: "A*", "A", "B", "C", "D", "E" or "U"
+    """
+    if mark >= 90:
+        return "A*"
+    elif mark >= 80:
+        return "A"
+    elif mark >= 70:
+        return "B"
+    elif mark >= 60:
+        return "C"
+    elif mark >= 50:
+        return "D"
+    elif mark >= 40:
+        return "E"
+    return "U"
+
+
+# Section A letter grades, best first
+LETTER_GRADES = ("A*", "A", "B", "C", "D", "E", "U")
+
+# Position in LETTER_GRADES of every mark 0-100
+LETTER_INDEX_BY_MARK = tuple(LETTER_GRADES.index(letter_grade(mark)) for mark in range(101))
+
+# Band names accepted by band queries -> the letter grades they cover
+# (Section A results: Distinction is 70+, Pass 50-69, Fail below 50)
+BAND_LETTERS = {
+    **{letter.casefold(): (letter,) for letter in LETTER_GRADES},
+    "distinction": ("A*", "A", "B"),
+    "pass": ("C", "D"),
+    "passed": ("A*", "A", "B", "C", "D"),
+    "fail": ("E", "U"),
+    "failed": ("E", "U"),
+}
+
 
 class StudentNotFoundError(Exception):
     """Custom exception for when a student is not found in the system"""
@@ -105,6 +194,1301 @@ class EmptyNameError(Exception):
     pass
 
 
+class InvalidQueryError(Exception):
+    """Custom exception for roster queries that cannot be parsed or run"""
+    pass
+
+
+def edit_distance(first, second):
+    """
+    Levenshtein edit distance between two strings (insert, delete, substitute)
+
+    Args:
+        first (str): First string
+        second (str): Second string
+
+    Returns:
+        int: Minimum number of single-character edits to turn first into second
+    """
+    return _masked_distance(_char_masks(first), len(first), second)
+
+
+def _char_masks(text):
+    """Bit mask of the positions of every character in text (bit i = position i)"""
+    masks = {}
+    for position, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def _masked_distance(masks, length, other):
+    """
+    Edit distance between a string (given by its _char_masks and length) and other
+    Myers' bit-parallel algorithm: one whole column of the edit-distance table is
+    held in two integers and advanced with a few bit operations per character of
+    other, instead of one min() per table cell. Compute the masks once to compare
+    one name against many.
+    """
+    if not length:
+        return len(other)
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    positive, negative, distance = full, 0, length  # Vertical +1 / -1 deltas of the column
+    for char in other:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & high:
+            distance += 1
+        elif horizontal_negative & high:
+            distance -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+    return distance
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over casefolded student names for typo-tolerant lookup
+    Each node stores one name and the students who share it; children are keyed
+    by their edit distance to the node, so searches can skip whole subtrees
+    """
+
+    def __init__(self):
+        """Initialize an empty tree"""
+        self.root = None  # Node: [name, list of students, {distance: child node}]
+
+    def add(self, name, student):
+        """
+        Insert a student under a casefolded name
+
+        Args:
+            name (str): Casefolded full name used as the metric key
+            student (Student): Student to store under that name
+        """
+        if self.root is None:
+            self.root = [name, [student], {}]
+            return
+
+        # The name's masks are reused for every node on the way down
+        masks, length = _char_masks(name), len(name)
+        node = self.root
+        while True:
+            distance = _masked_distance(masks, length, node[0])
+            if distance == 0:
+                node[1].append(student)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [name, [student], {}]
+                return
+            node = child
+
+    def remove(self, name, student):
+        """
+        Remove a student from the node holding their name
+        The node itself is kept (possibly empty) so the tree stays valid
+
+        Args:
+            name (str): Casefolded full name the student was added under
+            student (Student): Student to remove
+        """
+        masks, length = _char_masks(name), len(name)
+        node = self.root
+        while node is not None:
+            distance = _masked_distance(masks, length, node[0])
+            if distance == 0:
+                if student in node[1]:
+                    node[1].remove(student)
+                return
+            node = node[2].get(distance)
+
+    def search(self, name, max_distance):
+        """
+        Find all students whose name is within max_distance edits of name
+
+        Args:
+            name (str): Casefolded name to look up
+            max_distance (int): Maximum edit distance to accept
+
+        Returns:
+            list: (distance, Student) tuples ordered by distance
+        """
+        matches = []
+        masks, length = _char_masks(name), len(name)
+        pending = [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            distance = _masked_distance(masks, length, node[0])
+            if distance <= max_distance:
+                matches.extend((distance, student) for student in node[1])
+
+            # Triangle inequality: only children in this distance band can match
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    pending.append(child)
+
+        matches.sort(key=itemgetter(0))
+        return matches
+
+
+class GradeHistory:
+    """
+    Append-only, columnar log of every grade change
+    Records are packed into parallel typed arrays (student id, subject id, grade,
+    timestamp) instead of per-student objects. Appends normally arrive in time
+    order; a record older than the previous one starts a new time-sorted run,
+    so every run can be binary searched by timestamp.
+    """
+
+    def __init__(self):
+        """Initialize an empty history"""
+        self.student_ids = array("I")  # Gradebook-assigned student id per record
+        self.subject_ids = array("B")  # Index into self.subjects per record
+        self.grades = array("B")  # Grade (0-100) per record
+        self.timestamps = array("d")  # Seconds since the epoch per record
+        self.subjects = []  # Subject table - subject id -> subject name
+        self.names = {}  # student id -> current full name
+        self.removed = {}  # student id -> time the student was removed from the roster
+        self._subject_ids = {}  # subject name -> subject id
+        self._run_starts = [0]  # Record index where each time-sorted run begins
+        self._positions = {}  # student id -> array of that student's record indexes
+
+    def __len__(self):
+        """Return the number of recorded grade changes"""
+        return len(self.grades)
+
+    def register_student(self, student_id, full_name):
+        """Remember the name belonging to a student id"""
+        self.names[student_id] = full_name
+
+    def record_removal(self, student_id, timestamp=None):
+        """
+        Remember when a student left the roster (ids are never reused)
+
+        Args:
+            student_id (int): Gradebook-assigned student id
+            timestamp (float): Seconds since the epoch (defaults to now)
+        """
+        self.removed[student_id] = time.time() if timestamp is None else timestamp
+
+    def record(self, student_id, subject, grade, timestamp=None):
+        """
+        Append one grade change
+
+        Args:
+            student_id (int): Gradebook-assigned student id
+            subject (str): Subject that was graded
+            grade (int): New grade (0-100)
+            timestamp (float): Seconds since the epoch (defaults to now)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        subject_id = self._subject_ids.get(subject)
+        if subject_id is None:
+            subject_id = self._subject_ids[subject] = len(self.subjects)
+            self.subjects.append(subject)
+
+        # Out-of-order timestamp - begin a new sorted run
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self._run_starts.append(len(self.timestamps))
+
+        position = len(self.grades)
+        self.student_ids.append(student_id)
+        self.subject_ids.append(subject_id)
+        self.grades.append(grade)
+        self.timestamps.append(timestamp)
+
+        positions = self._positions.get(student_id)
+        if positions is None:
+            positions = self._positions[student_id] = array("Q")
+        positions.append(position)
+
+    def record_students(self, students, timestamp):
+        """
+        Append the current grades of many students in one batch, all stamped
+        with the same time (used when bulk-loading a roster)
+
+        Args:
+            students (iterable): Student objects with ids already assigned
+            timestamp (float): Seconds since the epoch for every record
+        """
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self._run_starts.append(len(self.timestamps))
+
+        student_ids = []
+        subject_ids = []
+        grades = []
+        subject_table = self._subject_ids
+        positions = self._positions
+        names = self.names
+        position = len(self.grades)
+
+        for student in students:
+            student_id = student.student_id
+            names[student_id] = student.full_name
+            student_positions = positions.get(student_id)
+            if student_positions is None:
+                student_positions = positions[student_id] = array("Q")
+            for subject, grade in student.grades.items():
+                subject_id = subject_table.get(subject)
+                if subject_id is None:
+                    subject_id = subject_table[subject] = len(self.subjects)
+                    self.subjects.append(subject)
+                student_ids.append(student_id)
+                subject_ids.append(subject_id)
+                grades.append(grade)
+                student_positions.append(position)
+                position += 1
+
+        # Extend each column once
+        self.student_ids.extend(student_ids)
+        self.subject_ids.extend(subject_ids)
+        self.grades.extend(grades)
+        self.timestamps.extend([timestamp] * len(grades))
+
+    def _runs(self):
+        """Yield (start, end) record ranges of the time-sorted runs"""
+        ends = self._run_starts[1:] + [len(self.timestamps)]
+        return zip(self._run_starts, ends)
+
+    def grades_as_of(self, when):
+        """
+        Reconstruct every student's grades as they stood at a point in time
+
+        Args:
+            when (float or datetime): Point in time (inclusive)
+
+        Returns:
+            dict: {student id: {subject: grade}} for students graded by then
+                  and not yet removed
+        """
+        when = _to_timestamp(when)
+
+        # Collect the latest record per (student, subject) across all runs
+        latest = {}
+        timestamps = self.timestamps
+        for start, end in self._runs():
+            cutoff = bisect.bisect_right(timestamps, when, start, end)
+            for position in range(start, cutoff):
+                key = (self.student_ids[position], self.subject_ids[position])
+                previous = latest.get(key)
+                if previous is None or timestamps[position] >= timestamps[previous]:
+                    latest[key] = position
+
+        roster = {}
+        removed = self.removed
+        for (student_id, subject_id), position in latest.items():
+            # Skip students who had already left the roster at that time
+            if student_id in removed and removed[student_id] <= when:
+                continue
+            roster.setdefault(student_id, {})[self.subjects[subject_id]] = self.grades[position]
+        return roster
+
+    def change_log(self, student_id, start=None, end=None):
+        """
+        All grade changes for one student, oldest first
+
+        Args:
+            student_id (int): Gradebook-assigned student id
+            start (float or datetime): Only include changes at or after this time
+            end (float or datetime): Only include changes at or before this time
+
+        Returns:
+            list: (timestamp, subject, grade) tuples in time order
+        """
+        positions = self._positions.get(student_id, ())
+        changes = sorted((self.timestamps[position], position) for position in positions)
+
+        # Binary search the time-ordered changes for the requested window
+        times = [timestamp for timestamp, _ in changes]
+        low = 0 if start is None else bisect.bisect_left(times, _to_timestamp(start))
+        high = len(changes) if end is None else bisect.bisect_right(times, _to_timestamp(end))
+
+        return [(timestamp, self.subjects[self.subject_ids[position]], self.grades[position])
+                for timestamp, position in changes[low:high]]
+
+
+def _to_timestamp(when):
+    """Convert a datetime (or an epoch number) to seconds since the epoch"""
+    if isinstance(when, datetime):
+        return when.timestamp()
+    return float(when)
+
+
+# Default grade points per Section A letter band (minimum mark -> points)
+DEFAULT_GRADE_POINTS = {90: 4.0, 80: 3.5, 70: 3.0, 60: 2.5, 50: 2.0, 40: 1.0, 0: 0.0}
+
+# Ranking keys accepted by the sort, paging and threshold-search paths
+SCORE_KEYS = ("average", "weighted", "gpa", "normalized")
+
+
+class GPAEngine:
+    """
+    Weighted-average and GPA calculator for a whole gradebook
+    Subject weights (e.g. credit hours) and a mark -> points table are turned
+    into lookup tables once, results are cached per student and the cache is
+    invalidated by the gradebook whenever one of the student's grades changes
+    """
+
+    def __init__(self, weights=None, grade_points=None):
+        """
+        Initialize the engine
+
+        Args:
+            weights (dict): {subject: weight}; subjects not listed weigh 1
+            grade_points (dict): {minimum mark: points}; defaults to DEFAULT_GRADE_POINTS
+
+        Raises:
+            ValueError: If a weight is negative or the points table has no entry for 0
+        """
+        self.weights = dict(weights or {})
+        if any(weight < 0 for weight in self.weights.values()):
+            raise ValueError("Subject weights cannot be negative")
+
+        grade_points = grade_points or DEFAULT_GRADE_POINTS
+        if 0 not in grade_points:
+            raise ValueError("Grade points table must include a minimum mark of 0")
+
+        # Expand the band table into a direct 0-100 lookup
+        self.points_by_mark = [0.0] * GRADE_BUCKETS
+        for mark in range(GRADE_BUCKETS):
+            floor_mark = max(minimum for minimum in grade_points if minimum <= mark)
+            self.points_by_mark[mark] = grade_points[floor_mark]
+
+        self._cache = {}  # Student -> (weighted average, GPA)
+
+    def invalidate(self, student):
+        """Forget the cached result for one student"""
+        self._cache.pop(student, None)
+
+    def _compute(self, student):
+        """Weighted average and GPA for one student (0, 0 if nothing is graded)"""
+        weights = self.weights
+        points_by_mark = self.points_by_mark
+        total_weight = weighted_marks = weighted_points = 0.0
+        for subject, grade in student.grades.items():
+            weight = weights.get(subject, 1)
+            total_weight += weight
+            weighted_marks += weight * grade
+            weighted_points += weight * points_by_mark[grade]
+        if not total_weight:
+            return 0.0, 0.0
+        return weighted_marks / total_weight, weighted_points / total_weight
+
+    def compute_all(self, students):
+        """
+        Fill the cache for every student that is missing a result, in one pass
+
+        Args:
+            students (iterable): Student objects to score
+        """
+        cache = self._cache
+        compute = self._compute
+        for student in students:
+            if student not in cache:
+                cache[student] = compute(student)
+
+    def weighted_average(self, student):
+        """Return the student's credit-weighted average mark"""
+        result = self._cache.get(student)
+        if result is None:
+            result = self._cache[student] = self._compute(student)
+        return result[0]
+
+    def gpa(self, student):
+        """Return the student's credit-weighted grade point average"""
+        result = self._cache.get(student)
+        if result is None:
+            result = self._cache[student] = self._compute(student)
+        return result[1]
+
+
+def _mean_and_std(counts):
+    """
+    Mean and population standard deviation of the marks in a 101-slot counter
+
+    Returns:
+        tuple: (mean, std, number of marks); (0.0, 0.0, 0) for an empty counter
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0, 0.0, 0
+    mean = sum(mark * count for mark, count in enumerate(counts)) / total
+    variance = sum(count * (mark - mean) ** 2 for mark, count in enumerate(counts)) / total
+    return mean, math.sqrt(variance), total
+
+
+class NormalizationEngine:
+    """
+    Cross-subject normalization so that a hard subject does not drag rankings down
+    Per-subject mean and standard deviation come straight from the gradebook's
+    101-slot grade counters, and are expanded into z-score and percentile-rank
+    tables indexed by mark. Scoring a student is then one table lookup per
+    subject. Tables and scores are cached against the gradebook version, so
+    they are rebuilt only after a grade, add or remove changes the roster.
+    """
+
+    def __init__(self):
+        """Initialize an empty engine (tables are built on first use)"""
+        self.stats = {}  # subject -> (mean, std, number of grades)
+        self._z_tables = {}  # subject -> z-score of every mark 0-100
+        self._rank_tables = {}  # subject -> percentile rank of every mark 0-100
+        self._scores = {}  # Student -> normalized average
+        self._version = None  # Gradebook version the tables were built for
+
+    def refresh(self, gradebook):
+        """
+        Rebuild the per-subject tables if the gradebook changed since the last build
+
+        Args:
+            gradebook (Gradebook): Gradebook whose grade counters are used
+        """
+        if self._version == gradebook.version:
+            return
+        self.stats = {}
+        self._z_tables = {}
+        self._rank_tables = {}
+        self._scores = {}
+        for subject, counts in gradebook._grade_counts.items():
+            mean, std, total = self.stats[subject] = _mean_and_std(counts)
+            if not total:
+                continue
+            # A subject where everyone scored the same carries no ranking signal
+            self._z_tables[subject] = [(mark - mean) / std if std else 0.0
+                                       for mark in range(GRADE_BUCKETS)]
+            # Mid-rank: students below the mark plus half of those on it
+            ranks = []
+            below = 0
+            for count in counts:
+                ranks.append(100 * (below + count / 2) / total)
+                below += count
+            self._rank_tables[subject] = ranks
+        self._version = gradebook.version
+
+    def compute_all(self, students):
+        """
+        Fill the score cache for every student that is missing a result, in one pass
+
+        Args:
+            students (iterable): Student objects to score
+        """
+        cache = self._scores
+        z_tables = self._z_tables
+        for student in students:
+            if student not in cache:
+                grades = student.grades
+                cache[student] = (sum(z_tables[subject][grade] for subject, grade in grades.items())
+                                  / len(grades)) if grades else 0.0
+
+    def normalized_average(self, student):
+        """Return the mean of the student's per-subject z-scores (0 if nothing is graded)"""
+        score = self._scores.get(student)
+        if score is None:
+            self.compute_all((student,))
+            score = self._scores[student]
+        return score
+
+    def z_scores(self, student):
+        """Return {subject: z-score} for each of the student's grades"""
+        return {subject: self._z_tables[subject][grade] for subject, grade in student.grades.items()}
+
+    def percentile_ranks(self, student):
+        """Return {subject: percentile rank 0-100} for each of the student's grades"""
+        return {subject: self._rank_tables[subject][grade]
+                for subject, grade in student.grades.items()}
+
+
+# Comparison operators accepted by the query language
+QUERY_OPERATORS = {
+    ">=": lambda value, target: value >= target,
+    "<=": lambda value, target: value <= target,
+    ">": lambda value, target: value > target,
+    "<": lambda value, target: value < target,
+    "==": lambda value, target: value == target,
+    "=": lambda value, target: value == target,
+    "!=": lambda value, target: value != target,
+}
+
+# Byte value marking a missing grade in the per-subject query columns
+MISSING_GRADE = 255
+
+# Translation tables that flip / keep 0-1 mask bytes
+_NOT_TABLE = bytes([1, 0] + [0] * 254)
+
+
+class GradebookQuery:
+    """
+    Compiled roster filter written in a small query language, e.g.
+        Math >= 70 and English < 50 and avg between 60 and 80 and name ~ "smi"
+
+    Fields: any subject, avg/average, weighted, gpa, normalized, name
+    Operators: >= <= > < == = != between ... and ..., and name ~ "text" (contains)
+    Combine with and / or / not and parentheses.
+
+    The text is parsed once into a plan. Executing the plan evaluates each
+    condition over whole columns at once: subject grades are byte columns
+    filtered with bytes.translate, name searches run str.find over one joined
+    string, and conditions are combined as 0/1 byte masks. The grade histograms
+    are used to skip conditions that cannot match and to run the most selective
+    conditions of an "and" first.
+    """
+
+    _TOKEN = re.compile(r'\s*(?:(-?\d+(?:\.\d+)?)|"([^"]*)"|\'([^\']*)\'|(>=|<=|==|!=|[><=~()])|([A-Za-z_]\w*))')
+
+    def __init__(self, text):
+        """
+        Parse a query into an execution plan
+
+        Args:
+            text (str): Query text
+
+        Raises:
+            InvalidQueryError: If the query is empty or not valid
+        """
+        if not text.strip():
+            raise InvalidQueryError("Query cannot be empty")
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._position = 0
+        self.plan = self._parse_or()
+        if self._position != len(self._tokens):
+            raise InvalidQueryError(f"Unexpected '{self._tokens[self._position][1]}' in query")
+        del self._tokens
+
+    # ---------------- Parsing ----------------
+    def _tokenize(self, text):
+        """Split the query into (kind, value) tokens"""
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = self._TOKEN.match(text, position)
+            if match is None:
+                raise InvalidQueryError(f"Cannot read query near '{text[position:].strip()}'")
+            number, double_quoted, single_quoted, symbol, word = match.groups()
+            if number is not None:
+                tokens.append(("number", float(number)))
+            elif double_quoted is not None or single_quoted is not None:
+                tokens.append(("string", double_quoted if double_quoted is not None else single_quoted))
+            elif symbol is not None:
+                tokens.append(("symbol", symbol))
+            else:
+                lowered = word.lower()
+                tokens.append(("keyword", lowered) if lowered in ("and", "or", "not", "between")
+                              else ("word", word))
+            position = match.end()
+        return tokens
+
+    def _peek(self):
+        """Return the next token without consuming it"""
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _take(self, kind, value=None):
+        """Consume the next token, checking its kind (and value)"""
+        token_kind, token_value = self._peek()
+        if token_kind != kind or (value is not None and token_value != value):
+            expected = value or kind
+            found = token_value if token_kind is not None else "end of query"
+            raise InvalidQueryError(f"Expected {expected} but found '{found}'")
+        self._position += 1
+        return token_value
+
+    def _parse_or(self):
+        nodes = [self._parse_and()]
+        while self._peek() == ("keyword", "or"):
+            self._position += 1
+            nodes.append(self._parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def _parse_and(self):
+        nodes = [self._parse_not()]
+        while self._peek() == ("keyword", "and"):
+            self._position += 1
+            nodes.append(self._parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def _parse_not(self):
+        if self._peek() == ("keyword", "not"):
+            self._position += 1
+            return ("not", self._parse_not())
+        if self._peek() == ("symbol", "("):
+            self._position += 1
+            node = self._parse_or()
+            self._take("symbol", ")")
+            return node
+        return self._parse_condition()
+
+    def _parse_condition(self):
+        field = self._take("word")
+        lowered = field.lower()
+
+        if lowered == "name":
+            operator = self._take("symbol")
+            if operator not in ("~", "==", "=", "!="):
+                raise InvalidQueryError("name supports ~ (contains), == and !=")
+            return ("name", operator, self._take("string").casefold())
+
+        field = {"avg": "average", "average": "average", "weighted": "weighted",
+                 "gpa": "gpa", "normalized": "normalized"}.get(lowered, field)
+        if self._peek() == ("keyword", "between"):
+            self._position += 1
+            low = self._take("number")
+            self._take("keyword", "and")
+            high = self._take("number")
+            return ("between", field, low, high)
+
+        operator = self._take("symbol")
+        if operator not in QUERY_OPERATORS:
+            raise InvalidQueryError(f"Unknown operator '{operator}' for {field}")
+        return ("compare", field, operator, self._take("number"))
+
+    def fields(self, node=None):
+        """Return the set of fields the plan's conditions read"""
+        node = self.plan if node is None else node
+        if node[0] in ("and", "or"):
+            return set().union(*(self.fields(child) for child in node[1]))
+        if node[0] == "not":
+            return self.fields(node[1])
+        return {"name"} if node[0] == "name" else {node[1]}
+
+    # ---------------- Execution ----------------
+    def execute(self, gradebook):
+        """
+        Run the plan against a gradebook
+
+        Args:
+            gradebook (Gradebook): Gradebook to filter
+
+        Returns:
+            list: Matching Student objects in roster order
+
+        Raises:
+            InvalidQueryError: If the query names an unknown subject or field
+        """
+        students = gradebook.students
+        mask = self._evaluate(self.plan, gradebook, len(students))
+
+        # Walk the 1-bytes of the final mask
+        matches = []
+        row = mask.find(1)
+        while row != -1:
+            matches.append(students[row])
+            row = mask.find(1, row + 1)
+        return matches
+
+    def _evaluate(self, node, gradebook, count, within=None):
+        """
+        Evaluate a plan node to a bytes mask with one 0/1 byte per student
+
+        Args:
+            within (bytes): Optional mask of candidate rows - score conditions,
+                            which have no column index, are only computed there
+        """
+        kind = node[0]
+
+        if kind == "and":
+            # Run the most selective conditions first and stop once nothing is left
+            children = sorted(node[1], key=lambda child: self._estimate(child, gradebook, count))
+            mask = within
+            for child in children:
+                child_mask = self._evaluate(child, gradebook, count, mask)
+                mask = child_mask if mask is None else _combine_masks(mask, child_mask, "and")
+                if 1 not in mask:
+                    break
+            return mask
+
+        if kind == "or":
+            mask = bytes(count)
+            for child in node[1]:
+                mask = _combine_masks(mask, self._evaluate(child, gradebook, count), "or")
+            return mask
+
+        if kind == "not":
+            return self._evaluate(node[1], gradebook, count).translate(_NOT_TABLE)
+
+        if kind == "name":
+            return self._name_mask(node[1], node[2], gradebook, count, within)
+
+        # Numeric condition on a subject or a score
+        field = node[1]
+        if kind == "between":
+            low, high = node[2], node[3]
+            test = lambda value: low <= value <= high
+        else:
+            compare, target = QUERY_OPERATORS[node[2]], node[3]
+            test = lambda value: compare(value, target)
+
+        subject = gradebook._query_subject(field)
+        if subject is not None:
+            # Histogram index: no student can match - skip the scan
+            counts = gradebook._counts_for(subject)
+            if not any(count_ for grade, count_ in enumerate(counts) if test(grade)):
+                return bytes(count)
+            table = bytes(1 if grade <= 100 and test(grade) else 0 for grade in range(256))
+            return gradebook._query_column(subject).translate(table)
+
+        if field in SCORE_KEYS:
+            if within is None:
+                return bytes(map(test, gradebook._query_scores(field)))
+
+            # Only score the rows that survived the earlier conditions,
+            # reading a cached score column when an earlier query built one
+            scores = gradebook._query_columns().get(("score", field))
+            if scores is None:
+                score = gradebook.score_function(field)
+                students = gradebook.students
+                scores = _LazyScores(score, students)
+            mask = bytearray(count)
+            row = within.find(1)
+            while row != -1:
+                if test(scores[row]):
+                    mask[row] = 1
+                row = within.find(1, row + 1)
+            return bytes(mask)
+
+        raise InvalidQueryError(f"Unknown field '{field}'. Available fields: "
+                                f"{', '.join(gradebook.subjects)}, avg, weighted, gpa, "
+                                f"normalized, name")
+
+    def _estimate(self, node, gradebook, count):
+        """Estimated number of matches for a node, from the grade histograms where possible"""
+        if node[0] in ("compare", "between"):
+            subject = gradebook._query_subject(node[1])
+            if subject is not None:
+                if node[0] == "between":
+                    return sum(gradebook._counts_for(subject)[max(0, math.ceil(node[2])):
+                                                              max(0, math.floor(node[3])) + 1])
+                compare, target = QUERY_OPERATORS[node[2]], node[3]
+                return sum(count_ for grade, count_ in enumerate(gradebook._counts_for(subject))
+                           if compare(grade, target))
+        # Name conditions run after the histogram-backed ones but before scores
+        return count // 2 if node[0] == "name" else count
+
+    def _name_mask(self, operator, text, gradebook, count, within=None):
+        """Mask of students whose casefolded full name contains / equals the text"""
+        if not count:
+            return bytes()
+        joined, starts, names = gradebook._query_names()
+        mask = bytearray(count)
+
+        if within is not None:
+            # Few candidates left - test just their names
+            test = {"~": lambda name: text in name, "!=": lambda name: name != text}.get(
+                operator, lambda name: name == text)
+            row = within.find(1)
+            while row != -1:
+                if test(names[row]):
+                    mask[row] = 1
+                row = within.find(1, row + 1)
+            return bytes(mask)
+
+        if operator == "~":
+            if not text:
+                # Every name contains the empty string
+                return b"\x01" * count
+            # One C-level str.find pass over all names joined by newlines
+            position = joined.find(text)
+            while position != -1:
+                mask[bisect.bisect_right(starts, position) - 1] = 1
+                position = joined.find(text, position + 1)
+            return bytes(mask)
+
+        # Exact name match - look for the whole newline-delimited name
+        needle = f"\n{text}\n"
+        position = joined.find(needle)
+        while position != -1:
+            mask[bisect.bisect_right(starts, position + 1) - 1] = 1
+            position = joined.find(needle, position + 1)
+        return bytes(mask) if operator in ("==", "=") else bytes(mask).translate(_NOT_TABLE)
+
+
+class _LazyScores:
+    """Index-style access to per-student scores, computed only for the rows read"""
+
+    def __init__(self, score, students):
+        self.score = score
+        self.students = students
+
+    def __getitem__(self, row):
+        return self.score(self.students[row])
+
+
+def _combine_masks(first, second, operation):
+    """AND / OR two 0-1 byte masks of equal length in one big-integer operation"""
+    left = int.from_bytes(first, "little")
+    right = int.from_bytes(second, "little")
+    combined = left & right if operation == "and" else left | right
+    return combined.to_bytes(len(first), "little")
+
+
+# Positions of the set bits in every byte value 0-255
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def _set_bit(bitmap, position):
+    """Set one bit in a bytearray bitmap, growing it as needed"""
+    index = position >> 3
+    if index >= len(bitmap):
+        bitmap.extend(bytes(index + 1 - len(bitmap)))
+    bitmap[index] |= 1 << (position & 7)
+
+
+def _clear_bit(bitmap, position):
+    """Clear one bit in a bytearray bitmap"""
+    index = position >> 3
+    if index < len(bitmap):
+        bitmap[index] &= ~(1 << (position & 7)) & 0xFF
+
+
+class BandQuery(GradebookQuery):
+    """
+    Compiled query over the per-subject grade band bitmaps, e.g.
+        Math is Fail and Science is Passed
+        Math is A* and English is A* and Science is A*
+
+    Conditions are "<subject> is <band>" (or "=" / "!="), where band is a
+    letter grade (A* to U) or a Section A result (Distinction, Pass, Fail,
+    plus Passed = Distinction or Pass, Failed = Fail). Combine with and / or /
+    not and parentheses. Each condition is one bitmap read from the gradebook,
+    so a whole query costs a few big-integer AND / OR / NOT operations.
+    """
+
+    # Same tokens as GradebookQuery, but words may end in * (for A*)
+    _TOKEN = re.compile(r'\s*(?:(-?\d+(?:\.\d+)?)|"([^"]*)"|\'([^\']*)\'|(>=|<=|==|!=|[><=~()])|([A-Za-z_]\w*\*?))')
+
+    def _parse_condition(self):
+        subject = self._take("word")
+        kind, value = self._peek()
+        if (kind, value) in (("symbol", "="), ("symbol", "==")) or \
+                (kind == "word" and value.lower() == "is"):
+            negate = False
+        elif (kind, value) == ("symbol", "!="):
+            negate = True
+        else:
+            raise InvalidQueryError(f"Expected 'is' after {subject}")
+        self._position += 1
+
+        band = self._take("word")
+        if band.casefold() not in BAND_LETTERS:
+            raise InvalidQueryError(f"Unknown band '{band}'. Available bands: "
+                                    f"{', '.join(LETTER_GRADES)}, Distinction, Pass, Fail, "
+                                    f"Passed, Failed")
+        node = ("band", subject, band.casefold())
+        return ("not", node) if negate else node
+
+    def execute(self, gradebook):
+        """
+        Run the plan against a gradebook's band bitmaps
+
+        Args:
+            gradebook (Gradebook): Gradebook to filter
+
+        Returns:
+            int: Bitmap with bit i set for every matching student id i
+
+        Raises:
+            InvalidQueryError: If the query names an unknown subject
+        """
+        return self._evaluate(self.plan, gradebook)
+
+    def _evaluate(self, node, gradebook, count=None, within=None):
+        """Evaluate a plan node to a bitmap (Python int, one bit per student id)"""
+        kind = node[0]
+        if kind == "and":
+            bitmap = -1
+            for child in node[1]:
+                bitmap &= self._evaluate(child, gradebook)
+                if not bitmap:
+                    break
+            return bitmap
+        if kind == "or":
+            bitmap = 0
+            for child in node[1]:
+                bitmap |= self._evaluate(child, gradebook)
+            return bitmap
+        if kind == "not":
+            return gradebook.band_bitmap() & ~self._evaluate(node[1], gradebook)
+
+        subject = gradebook._query_subject(node[1])
+        if subject is None:
+            raise InvalidQueryError(f"Unknown subject '{node[1]}'. "
+                                    f"Available subjects: {', '.join(gradebook.subjects)}")
+        return gradebook.band_bitmap(subject, node[2])
+
+
+class GradebookStore:
+    """
+    Append-only on-disk store of student records (one JSON object per line)
+    Each save appends the latest record of every changed student, or a tombstone
+    for removed students; an in-memory index maps student id -> file offset of
+    the current record. compact() rewrites the file with live records only.
+    """
+
+    # Compact once the file holds this many times more records than live students
+    COMPACTION_RATIO = 2
+    # ... but never bother for small files
+    COMPACTION_MIN_RECORDS = 1000
+
+    def __init__(self, path, truncate=False):
+        """
+        Open (or create) a store file and rebuild its index
+
+        Args:
+            path (str): Path to the store file
+            truncate (bool): True to discard any existing content
+
+        Raises:
+            ValueError: If an existing file contains an invalid record
+        """
+        self.path = path
+        self.index = {}  # student id -> offset of the student's latest record
+        self.positions = {}  # student id -> offset of the student's first record (roster order)
+        self.record_count = 0  # Records in the file, including superseded ones
+
+        if truncate or not os.path.exists(path):
+            open(path, "wb").close()
+            return
+
+        # Scan the log once - later records supersede earlier ones
+        with open(path, "rb") as file:
+            offset = 0
+            for line_number, line in enumerate(file, start=1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    raise ValueError(f"Invalid record on line {line_number} of {path}")
+                if record.get("removed"):
+                    self.index.pop(record["id"], None)
+                    self.positions.pop(record["id"], None)
+                else:
+                    self.index[record["id"]] = offset
+                    self.positions.setdefault(record["id"], offset)
+                self.record_count += 1
+                offset += len(line)
+
+    def __len__(self):
+        """Return the number of live students in the store"""
+        return len(self.index)
+
+    def load_students(self):
+        """
+        Read the latest record of every live student
+
+        Returns:
+            list: New Student objects in roster order (the order each student was
+                  first written in, so a regrade does not move them to the end)
+        """
+        students = []
+        with open(self.path, "rb") as file:
+            for student_id in sorted(self.index, key=self.positions.__getitem__):
+                file.seek(self.index[student_id])
+                record = json.loads(file.readline())
+                student = Student(record["first_name"], record["surname"])
+                student.grades = record["grades"]
+                students.append(student)
+        return students
+
+    def append(self, students, removed_ids):
+        """
+        Append records for changed students and tombstones for removed ones
+
+        Args:
+            students (iterable): Students whose current state must be saved, in roster order
+            removed_ids (iterable): Ids of students removed since the last save
+
+        Returns:
+            int: Number of records written
+        """
+        written = 0
+        with open(self.path, "ab") as file:
+            offset = file.tell()
+            for student_id in removed_ids:
+                line = (json.dumps({"id": student_id, "removed": True}) + "\n").encode("utf-8")
+                file.write(line)
+                self.index.pop(student_id, None)
+                self.positions.pop(student_id, None)
+                offset += len(line)
+                written += 1
+            for student in students:
+                line = (json.dumps(_store_record(student)) + "\n").encode("utf-8")
+                file.write(line)
+                self.index[student.student_id] = offset
+                self.positions.setdefault(student.student_id, offset)
+                offset += len(line)
+                written += 1
+            file.flush()
+            os.fsync(file.fileno())
+        self.record_count += written
+        return written
+
+    def needs_compaction(self):
+        """True when superseded records make up most of the file"""
+        return (self.record_count >= self.COMPACTION_MIN_RECORDS
+                and self.record_count > self.COMPACTION_RATIO * max(len(self.index), 1))
+
+    def compact(self, students):
+        """
+        Rewrite the store with exactly one record per live student
+        Written to a temporary file first and renamed over the store atomically
+
+        Args:
+            students (iterable): Every live student
+        """
+        temp_path = f"{self.path}.tmp"
+        index = {}
+        with open(temp_path, "wb") as file:
+            offset = 0
+            for student in students:
+                line = (json.dumps(_store_record(student)) + "\n").encode("utf-8")
+                file.write(line)
+                index[student.student_id] = offset
+                offset += len(line)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self.index = index
+        self.positions = dict(index)
+        self.record_count = len(index)
+
+
+def _store_record(student):
+    """Return the JSON-serialisable record saved for a student"""
+    return {"id": student.student_id, "first_name": student.first_name,
+            "surname": student.surname, "grades": student.grades}
+
+
+class AutosaveService:
+    """
+    Saves a snapshot of a Gradebook to disk on a background thread
+    The service keeps its own copy of every student record. Edits only mark
+    students as pending (O(1) on the menu thread); the worker copies the
+    pending records, then serialises the whole snapshot, fsyncs it and renames
+    it over the save file, so the file is always a complete gradebook store
+    that Gradebook.open_store can load. Edits arriving within `interval`
+    seconds of each other are coalesced into a single write.
+    """
+
+    def __init__(self, gradebook, path, interval=5.0):
+        """
+        Attach an autosave service to a gradebook (call start() to begin saving)
+
+        Args:
+            gradebook (Gradebook): Gradebook to save
+            path (str): File the snapshot is written to
+            interval (float): Seconds to wait after an edit so bursts share one write
+
+        Raises:
+            ValueError: If interval is negative or path is the gradebook's own store
+        """
+        if interval < 0:
+            raise ValueError("Autosave interval cannot be negative")
+        if gradebook.store is not None and os.path.abspath(path) == os.path.abspath(gradebook.store.path):
+            raise ValueError("Autosave file must differ from the gradebook's save file")
+        self.gradebook = gradebook
+        self.path = path
+        self.interval = interval
+        self.saves = 0  # Snapshots written so far
+        self.last_error = None  # Exception raised by the most recent failed save
+        self._records = {}  # student id -> record, owned by the worker thread
+        self._pending = {}  # student id -> Student changed since the last snapshot
+        self._removed = set()  # Ids removed since the last snapshot
+        self._lock = threading.Lock()  # Guards _pending and _removed
+        self._wakeup = threading.Event()  # Set when there is something to save
+        self._hurry = threading.Event()  # Set to cut the coalescing wait short
+        self._idle = threading.Event()  # Set while nothing is pending or being written
+        self._idle.set()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread and queue a first snapshot of the whole roster"""
+        if self._thread is not None:
+            return
+        self.gradebook.autosave = self
+        self.mark_changed_many(self.gradebook.students)
+        self._thread = threading.Thread(target=self._run, name="gradebook-autosave", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write any pending changes, then stop the worker thread and detach"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._hurry.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.gradebook.autosave = None
+
+    def mark_changed(self, student):
+        """Queue a student's current record for the next snapshot (called by Gradebook)"""
+        with self._lock:
+            self._pending[student.student_id] = student
+            self._removed.discard(student.student_id)
+            self._idle.clear()
+        self._wakeup.set()
+
+    def mark_changed_many(self, students):
+        """Queue many students at once, e.g. after a bulk load"""
+        with self._lock:
+            for student in students:
+                self._pending[student.student_id] = student
+            self._idle.clear()
+        self._wakeup.set()
+
+    def mark_removed(self, student_id):
+        """Queue the removal of a student from the next snapshot (called by Gradebook)"""
+        with self._lock:
+            self._pending.pop(student_id, None)
+            self._removed.add(student_id)
+            self._idle.clear()
+        self._wakeup.set()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued change has been written
+
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if nothing is left to save
+        """
+        # Skip the coalescing delay for whatever is queued now
+        if not self._idle.is_set():
+            self._hurry.set()
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        """Worker loop: wait for an edit, let the burst settle, then write one snapshot"""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # Edits made during this window are written together
+            self._hurry.wait(self.interval)
+            self._hurry.clear()
+            self._save_snapshot()
+            if self._stopping:
+                # Write edits that arrived while the last snapshot was being written
+                while self._has_pending() and self.last_error is None:
+                    self._save_snapshot()
+                return
+
+    def _has_pending(self):
+        """True if any change is queued for the next snapshot"""
+        with self._lock:
+            return bool(self._pending or self._removed)
+
+    def _take_snapshot(self):
+        """
+        Copy the pending records into the service's own snapshot
+        Only the swap of the pending queues happens under the lock, so edits on
+        the menu thread never wait for a large copy. A student edited during the
+        copy is queued again and rewritten by the next snapshot.
+
+        Returns:
+            bool: True if anything changed
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            removed, self._removed = self._removed, set()
+        for student_id, student in pending.items():
+            # dict() copies the grades in one step under the GIL
+            self._records[student_id] = {"id": student_id, "first_name": student.first_name,
+                                         "surname": student.surname,
+                                         "grades": dict(student.grades)}
+        for student_id in removed:
+            self._records.pop(student_id, None)
+        return bool(pending or removed)
+
+    def _save_snapshot(self):
+        """Serialise the snapshot to a temporary file, fsync it and rename it into place"""
+        try:
+            if self._take_snapshot() or not os.path.exists(self.path):
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    file.writelines(json.dumps(record) + "\n" for record in self._records.values())
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self.path)
+                self.saves += 1
+            self.last_error = None
+        except OSError as e:
+            # Keep the menu running - the next edit retries the save
+            self.last_error = e
+        with self._lock:
+            if not self._pending and not self._removed:
+                self._idle.set()
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of each student's rendered text
+    Entries are keyed by Student and hold one string per display style; the
+    gradebook drops a student's entry whenever their grades or name change,
+    and the least recently shown students are evicted beyond max_students
+    """
+
+    def __init__(self, max_students=100_000):
+        """
+        Args:
+            max_students (int): Maximum number of students kept in the cache
+
+        Raises:
+            ValueError: If max_students is not positive
+        """
+        if max_students <= 0:
+            raise ValueError("Render cache size must be a positive number")
+        self.max_students = max_students
+        self._entries = OrderedDict()  # Student -> {style: text}, in LRU order
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Return the number of students with cached text"""
+        return len(self._entries)
+
+    def get(self, student, style):
+        """
+        Return the student's text in a display style, formatting it only on a miss
+
+        Args:
+            student (Student): Student to render
+            style (str): One of the styles accepted by Student.format_text
+
+        Returns:
+            str: Rendered text
+        """
+        entry = self._entries.get(student)
+        if entry is None:
+            entry = self._entries[student] = {}
+            if len(self._entries) > self.max_students:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(student)
+        text = entry.get(style)
+        if text is None:
+            text = entry[style] = student.format_text(style)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def invalidate(self, student):
+        """Forget every rendered text of one student"""
+        self._entries.pop(student, None)
+
+    def clear(self):
+        """Forget every rendered text"""
+        self._entries.clear()
+
+
 class Student:
     """
     Represents a student with personal information and academic grades
@@ -127,14 +1511,67 @@ class Student:
             raise EmptyNameError("First name and surname cannot be empty")
 
         # Initialize instance attributes
-        self.first_name = first_name.strip()
-        self.surname = surname.strip()
+        self._first_name = first_name.strip()
+        self._surname = surname.strip()
         self.grades = {}  # Dictionary to store subject: grade pairs
+        self.gradebook = None  # Gradebook this student belongs to (set when added)
+        self.student_id = None  # Id assigned by the gradebook (used by the grade history)
+        self.dirty = True  # True until the student's current record has been saved
+
+    @property
+    def first_name(self):
+        """Return the student's first name"""
+        return self._first_name
+
+    @first_name.setter
+    def first_name(self, first_name):
+        """
+        Change the first name with validation
+
+        Raises:
+            EmptyNameError: If first_name is empty/whitespace
+        """
+        self.rename(first_name, self._surname)
+
+    @property
+    def surname(self):
+        """Return the student's surname"""
+        return self._surname
+
+    @surname.setter
+    def surname(self, surname):
+        """
+        Change the surname with validation
+
+        Raises:
+            EmptyNameError: If surname is empty/whitespace
+        """
+        self.rename(self._first_name, surname)
+
+    def rename(self, first_name, surname):
+        """
+        Change both names at once and let the owning gradebook re-index the student
+
+        Args:
+            first_name (str): New first name
+            surname (str): New surname
+
+        Raises:
+            EmptyNameError: If first_name or surname is empty/whitespace
+        """
+        if not first_name.strip() or not surname.strip():
+            raise EmptyNameError("First name and surname cannot be empty")
+        old_full_name = self.full_name
+        self._first_name = first_name.strip()
+        self._surname = surname.strip()
+        self.dirty = True
+        if self.gradebook is not None:
+            self.gradebook._name_changed(self, old_full_name)
 
     @property
     def full_name(self):
         """Return the student's full name as a computed property"""
-        return f"{self.first_name} {self.surname}"
+        return f"{self._first_name} {self._surname}"
 
     def add_grade(self, subject, grade):
         """
@@ -151,45 +1588,2606 @@ class Student:
         if not isinstance(grade, int) or grade < 0 or grade > 100:
             raise InvalidGradeError("Grade must be an integer between 0 and 100")
 
-        # Store the validated grade
-        self.grades[subject] = grade
+        # Store the validated grade
+        old_grade = self.grades.get(subject)
+        self.grades[subject] = grade
+        self.dirty = True
+
+        # Let the owning gradebook refresh anything derived from this grade
+        if self.gradebook is not None:
+            self.gradebook._grade_changed(self, subject, old_grade)
+
+    def get_average(self):
+        """
+        Calculate and return the average grade across all subjects
+
+        Returns:
+            float: Average grade, or 0 if no grades available
+        """
+        if not self.grades:
+            return 0
+        return sum(self.grades.values()) / len(self.grades)
+
+    def __getstate__(self):
+        """Pickle only the student's own data, not the gradebook it belongs to"""
+        state = self.__dict__.copy()
+        state["gradebook"] = None
+        return state
+
+    def format_text(self, style="info"):
+        """
+        Format the student for display (uncached - see render)
+
+        Args:
+            style (str): "info" (name, one line per grade, average) or
+                         "summary" (single line for listings)
+
+        Returns:
+            str: Formatted text
+
+        Raises:
+            ValueError: If style is not recognised
+        """
+        if style == "info":
+            lines = [f"\n{self.full_name}"]
+            lines += [f"  {subject}: {grade}" for subject, grade in self.grades.items()]
+            lines.append(f"  Average: {self.get_average():.2f}")
+            return "\n".join(lines)
+        if style == "summary":
+            grades = ", ".join(f"{subject}: {grade}" for subject, grade in self.grades.items())
+            return f"{self.full_name} | {grades} | Average: {self.get_average():.2f}"
+        raise ValueError("Display style must be 'info' or 'summary'")
+
+    def render(self, style="info"):
+        """Return the formatted text, from the gradebook's render cache when it has one"""
+        # Copies returned by a ShardedGradebook belong to a book without a cache
+        render_cache = getattr(self.gradebook, "render_cache", None)
+        if render_cache is None:
+            return self.format_text(style)
+        return render_cache.get(self, style)
+
+    def display_info(self):
+        """Display student's complete information and grades in formatted output"""
+        print(self.render("info"))
+
+
+class Gradebook:
+    """
+    Manages a collection of Student objects with comprehensive operations
+    Includes searching, sorting, and data management functionalities
+    """
+
+    def __init__(self):
+        """Initialize an empty gradebook with predefined subjects"""
+        self.students = []  # List to store Student objects
+        self.subjects = ["Math", "English", "Science"]  # Available subjects
+        self.version = 0  # Mutation counter - bumped on every add, remove or grade change
+        self.view_cache_size = 16  # Maximum number of sorted views kept in memory
+        self._view_cache = OrderedDict()  # view key -> (version, sorted list), in LRU order
+        self._name_tree = None  # BK-tree over casefolded full names (built on first fuzzy search)
+        self._name_keys = []  # Sorted (casefolded full name, student id) of every student
+        self._name_order = []  # Students in the same order as _name_keys
+        self._grade_counts = {}  # subject -> 101-slot count of students per grade
+        self._average_counts = [0] * GRADE_BUCKETS  # count of students per rounded average
+        self._letter_counts = dict.fromkeys(LETTER_GRADES, 0)  # letter grade of average -> students
+        self._result_counts = dict.fromkeys(RESULT_BANDS, 0)  # result of average -> students
+        self._average_total = 0.0  # Sum of every graded student's average
+        self.history = GradeHistory()  # Audit trail of every grade change
+        self.gpa_engine = GPAEngine()  # Weighted average / GPA calculator (equal weights by default)
+        self.normalizer = NormalizationEngine()  # Per-subject z-scores and percentile ranks
+        self._next_student_id = 0  # Next id handed out by _attach_student
+        self.store = None  # GradebookStore used by save_incremental
+        self._dirty_students = {}  # Students added or regraded since the last save, in change order
+        self._removed_ids = {}  # Ids of students removed since the last save, in removal order
+        self._query_cache = (None, {})  # (version, columns) used by GradebookQuery
+        self.autosave = None  # AutosaveService notified of every change, if enabled
+        self.render_cache = RenderCache()  # Rendered display text per student
+        self._live_bits = bytearray()  # Bitmap of the ids of students in the roster
+        self._band_bits = {}  # subject -> one bitmap of student ids per LETTER_GRADES entry
+
+    def _bump_version(self):
+        """Record a mutation so that every cached sorted view becomes stale"""
+        self.version += 1
+
+    def _count_grade(self, subject, grade, delta):
+        """Adjust the per-subject grade counter by delta (+1 on add, -1 on remove)"""
+        counts = self._grade_counts.get(subject)
+        if counts is None:
+            counts = self._grade_counts[subject] = [0] * GRADE_BUCKETS
+        counts[grade] += delta
+
+    def _subject_band_bits(self, subject):
+        """Return a subject's band bitmaps (one per letter grade), creating them if needed"""
+        band_bits = self._band_bits.get(subject)
+        if band_bits is None:
+            band_bits = self._band_bits[subject] = [bytearray() for _ in LETTER_GRADES]
+        return band_bits
+
+    def _count_average(self, average, delta):
+        """Adjust every counter keyed on a student's average by delta (+1 on add, -1 on remove)"""
+        self._average_counts[_round_average(average)] += delta
+        self._letter_counts[letter_grade(average)] += delta
+        self._result_counts[result_band(average)] += delta
+        self._average_total += delta * average
+
+    def _count_student(self, student, delta):
+        """Add (delta=1) or remove (delta=-1) all of a student's grades from the counters"""
+        for subject, grade in student.grades.items():
+            self._count_grade(subject, grade, delta)
+        if student.grades:
+            self._count_average(student.get_average(), delta)
+
+    def _grade_changed(self, student, subject, old_grade):
+        """
+        Hook called by Student.add_grade after a grade is stored
+
+        Args:
+            student (Student): Student whose grade changed
+            subject (str): Subject that was graded
+            old_grade (int): Previous grade, or None if the subject was new
+        """
+        grades = student.grades
+        new_grade = grades[subject]
+
+        # Move the student between grade buckets for this subject
+        if old_grade is not None:
+            self._count_grade(subject, old_grade, -1)
+        self._count_grade(subject, new_grade, 1)
+
+        # Move the student between average buckets, letter grades and results
+        total = sum(grades.values())
+        if old_grade is None:
+            if len(grades) > 1:
+                self._count_average((total - new_grade) / (len(grades) - 1), -1)
+        else:
+            self._count_average((total - new_grade + old_grade) / len(grades), -1)
+        self._count_average(total / len(grades), 1)
+
+        # Move the student's bit between this subject's band bitmaps
+        band_bits = self._subject_band_bits(subject)
+        if old_grade is not None:
+            _clear_bit(band_bits[LETTER_INDEX_BY_MARK[old_grade]], student.student_id)
+        _set_bit(band_bits[LETTER_INDEX_BY_MARK[new_grade]], student.student_id)
+
+        self.history.record(student.student_id, subject, new_grade)
+        self.gpa_engine.invalidate(student)
+        self.render_cache.invalidate(student)
+        self._dirty_students[student] = None
+        if self.autosave is not None:
+            self.autosave.mark_changed(student)
+        self._bump_version()
+
+    def _name_changed(self, student, old_full_name):
+        """
+        Hook called by Student when its first name or surname changes
+
+        Args:
+            student (Student): Renamed student
+            old_full_name (str): Full name before the change
+        """
+        # Move the student within the name indexes
+        if self._name_tree is not None:
+            self._name_tree.remove(old_full_name.casefold(), student)
+            self._name_tree.add(student.full_name.casefold(), student)
+        position = bisect.bisect_left(self._name_keys, (old_full_name.casefold(), student.student_id))
+        del self._name_keys[position]
+        del self._name_order[position]
+        name_key = (student.full_name.casefold(), student.student_id)
+        position = bisect.bisect_left(self._name_keys, name_key)
+        self._name_keys.insert(position, name_key)
+        self._name_order.insert(position, student)
+        self.history.register_student(student.student_id, student.full_name)
+
+        self.render_cache.invalidate(student)
+        self._dirty_students[student] = None
+        if self.autosave is not None:
+            self.autosave.mark_changed(student)
+        self._bump_version()
+
+    def subject_statistics(self):
+        """
+        Mean and standard deviation of every subject's grades
+
+        Returns:
+            dict: {subject: (mean, std, number of grades)}
+        """
+        self.normalizer.refresh(self)
+        return dict(self.normalizer.stats)
+
+    def standardized_scores(self, full_name):
+        """
+        A student's z-score and percentile rank in each graded subject
+
+        Args:
+            full_name (str): Full name of the student
+
+        Returns:
+            dict: {subject: (z-score, percentile rank)}
+
+        Raises:
+            StudentNotFoundError: If student not found in system
+        """
+        student = self.search_student(full_name)
+        if student is None:
+            raise StudentNotFoundError(f"Student '{full_name}' not found")
+        self.normalizer.refresh(self)
+        z_scores = self.normalizer.z_scores(student)
+        ranks = self.normalizer.percentile_ranks(student)
+        return {subject: (z_scores[subject], ranks[subject]) for subject in z_scores}
+
+    def set_gpa_engine(self, engine):
+        """
+        Replace the GPA engine (e.g. to apply credit-hour weights)
+
+        Args:
+            engine (GPAEngine): Engine used for the "weighted" and "gpa" keys
+
+        Raises:
+            TypeError: If parameter is not a GPAEngine object
+        """
+        if not isinstance(engine, GPAEngine):
+            raise TypeError("GPA engine must be a GPAEngine object")
+        self.gpa_engine = engine
+        self._bump_version()
+
+    def score_function(self, key="average"):
+        """
+        Return the function that scores a student for a ranking key
+
+        Args:
+            key (str): "average", "weighted" (credit-weighted average), "gpa" or
+                       "normalized" (mean of the student's per-subject z-scores)
+
+        Returns:
+            callable: Function taking a Student and returning its score
+
+        Raises:
+            ValueError: If key is not one of SCORE_KEYS
+        """
+        if key == "average":
+            return Student.get_average
+        if key == "weighted" or key == "gpa":
+            # Score every stale student in one pass before the sort/search walks them
+            self.gpa_engine.compute_all(self.students)
+            return self.gpa_engine.weighted_average if key == "weighted" else self.gpa_engine.gpa
+        if key == "normalized":
+            self.normalizer.refresh(self)
+            self.normalizer.compute_all(self.students)
+            return self.normalizer.normalized_average
+        raise ValueError(f"Invalid ranking key. Available keys: {', '.join(SCORE_KEYS)}")
+
+    def _cached_view(self, view_key, build):
+        """
+        Return a memoized sorted view, rebuilding it only if the roster changed
+
+        Args:
+            view_key (tuple): Identifies the view, e.g. ("average", True)
+            build (callable): Builds the sorted list when the cache is stale
+
+        Returns:
+            list: Cached sorted list of Student objects (treat as read-only)
+        """
+        entry = self._view_cache.get(view_key)
+        if entry is not None and entry[0] == self.version:
+            # Cache hit - mark as most recently used
+            self._view_cache.move_to_end(view_key)
+            return entry[1]
+
+        # Cache miss or stale entry - rebuild and store against current version
+        view = build()
+        self._view_cache[view_key] = (self.version, view)
+        self._view_cache.move_to_end(view_key)
+
+        # Evict least recently used views beyond the limit
+        while len(self._view_cache) > self.view_cache_size:
+            self._view_cache.popitem(last=False)
+        return view
+
+    def add_student(self, student):
+        """
+        Add a student to the gradebook with type validation
+
+        Args:
+            student (Student): Student object to add
+
+        Raises:
+            TypeError: If parameter is not a Student object
+        """
+        # Validate input type
+        if not isinstance(student, Student):
+            raise TypeError("Can only add Student objects to gradebook")
+
+        # Add student to collection
+        self._attach_student(student)
+        print(f"Student {student.full_name} added successfully!")
+
+    def _attach_student(self, student):
+        """
+        Add a student and update every index, without printing
+        Used by add_student
+
+        Args:
+            student (Student): Student object to add
+        """
+        self.students.append(student)
+        self._index_student(student, time.time())
+        self._bump_version()
+
+    def _attach_many(self, students):
+        """
+        Add many students at once without printing, for the bulk loaders
+        The roster is extended in one step and the version is bumped only once
+
+        Args:
+            students (list): Student objects to add
+        """
+        start = len(self.students)
+        self.students.extend(students)
+        added = self.students[start:]
+
+        # Assign ids and fill the grade counters with local lookups only
+        grade_counts = self._grade_counts
+        count_average = self._count_average
+        next_id = self._next_student_id
+
+        # Size the bitmaps of the known subjects once for the new ids, then set bits in place
+        size = ((next_id + len(added)) >> 3) + 1
+        live_bits = self._live_bits
+        live_bits.extend(bytes(max(0, size - len(live_bits))))
+        for subject in set(self.subjects).union(self._band_bits):
+            for bitmap in self._subject_band_bits(subject):
+                bitmap.extend(bytes(max(0, size - len(bitmap))))
+        band_bits = self._band_bits
+        letter_index = LETTER_INDEX_BY_MARK
+
+        for student in added:
+            student.gradebook = self
+            student.student_id = next_id
+            byte, bit = next_id >> 3, 1 << (next_id & 7)
+            live_bits[byte] |= bit
+            next_id += 1
+            grades = student.grades
+            if grades:
+                for subject, grade in grades.items():
+                    counts = grade_counts.get(subject)
+                    if counts is None:
+                        counts = grade_counts[subject] = [0] * GRADE_BUCKETS
+                    counts[grade] += 1
+                    subject_bits = band_bits.get(subject)
+                    if subject_bits is None:
+                        # First grade in a subject outside self.subjects - size its bitmaps too
+                        subject_bits = self._subject_band_bits(subject)
+                        for bitmap in subject_bits:
+                            bitmap.extend(bytes(size))
+                    subject_bits[letter_index[grade]][byte] |= bit
+                count_average(sum(grades.values()) / len(grades), 1)
+        self._next_student_id = next_id
+
+        # Batch the remaining indexes
+        self.history.record_students(added, time.time())
+        if self._name_tree is not None:
+            for student in added:
+                self._name_tree.add(student.full_name.casefold(), student)
+        entries = sorted(zip(self._name_keys + [(student.full_name.casefold(), student.student_id)
+                                                for student in added],
+                             self._name_order + added), key=itemgetter(0))
+        self._name_keys = [name_key for name_key, _ in entries]
+        self._name_order = [student for _, student in entries]
+        self._dirty_students.update(dict.fromkeys(student for student in added if student.dirty))
+        if self.autosave is not None:
+            self.autosave.mark_changed_many(added)
+        self._bump_version()
+
+    def _index_student(self, student, timestamp):
+        """Assign an id to a newly added student and register them with every index"""
+        student.gradebook = self
+        student.student_id = self._next_student_id
+        self._next_student_id += 1
+        self._count_student(student, 1)
+        _set_bit(self._live_bits, student.student_id)
+        for subject, grade in student.grades.items():
+            _set_bit(self._subject_band_bits(subject)[LETTER_INDEX_BY_MARK[grade]], student.student_id)
+
+        # Start the student's audit trail with the grades they arrived with
+        self.history.register_student(student.student_id, student.full_name)
+        for subject, grade in student.grades.items():
+            self.history.record(student.student_id, subject, grade, timestamp)
+        if self._name_tree is not None:
+            self._name_tree.add(student.full_name.casefold(), student)
+        name_key = (student.full_name.casefold(), student.student_id)
+        position = bisect.bisect_left(self._name_keys, name_key)
+        self._name_keys.insert(position, name_key)
+        self._name_order.insert(position, student)
+        if student.dirty:
+            self._dirty_students[student] = None
+        if self.autosave is not None:
+            self.autosave.mark_changed(student)
+
+    def remove_student(self, full_name):
+        """
+        Remove a student by full name using linear search algorithm
+
+        Args:
+            full_name (str): Full name of student to remove
+
+        Returns:
+            bool: True if student found and removed, False otherwise
+
+        Raises:
+            EmptyNameError: If full_name is empty or whitespace
+            StudentNotFoundError: If student not found in system
+        """
+        # Validate input
+        if not full_name.strip():
+            raise EmptyNameError("Student name cannot be empty")
+
+        removed_student = self._pop_student(full_name)
+        print(f"Student {removed_student.full_name} removed successfully!")
+        return True
+
+    def _pop_student(self, full_name):
+        """
+        Find a student by full name and remove them without printing
+
+        Returns:
+            Student: The removed student
+
+        Raises:
+            StudentNotFoundError: If student not found in system
+        """
+        # Linear search through students list
+        target = full_name.lower().strip()
+        for i, student in enumerate(self.students):
+            if student.full_name.lower() == target:
+                return self._detach_student(i)
+
+        # Student not found - raise custom exception
+        raise StudentNotFoundError(f"Student '{full_name}' not found")
+
+    def iter_students(self, filter=None, key=None):
+        """
+        Lazily iterate over students, optionally filtered and projected
+
+        Nothing is copied: each result is produced as soon as it is found,
+        so callers can print or stream the first match immediately
+
+        Args:
+            filter (callable or list): Predicate taking a Student, or a list of
+                                       predicates that must all be True
+            key (callable): Projection applied to each matching Student
+                            (defaults to yielding the Student itself)
+
+        Yields:
+            Student or projected value for every matching student
+        """
+        # Combine multiple predicates into one
+        if filter is not None and not callable(filter):
+            predicates = tuple(filter)
+            filter = lambda student: all(predicate(student) for predicate in predicates)
+
+        students = self.students if filter is None else (
+            student for student in self.students if filter(student))
+        if key is None:
+            yield from students
+        else:
+            for student in students:
+                yield key(student)
+
+    def _detach_student(self, index):
+        """
+        Remove the student at a list position and update every index, without printing
+
+        Args:
+            index (int): Position of the student in self.students
+
+        Returns:
+            Student: The removed student
+        """
+        removed_student = self.students.pop(index)
+        removed_student.gradebook = None
+        self._count_student(removed_student, -1)
+        _clear_bit(self._live_bits, removed_student.student_id)
+        for subject, grade in removed_student.grades.items():
+            _clear_bit(self._band_bits[subject][LETTER_INDEX_BY_MARK[grade]],
+                       removed_student.student_id)
+        self._dirty_students.pop(removed_student, None)
+        self._removed_ids[removed_student.student_id] = None
+        self.history.record_removal(removed_student.student_id)
+        removed_student.dirty = True
+        self.gpa_engine.invalidate(removed_student)
+        self.render_cache.invalidate(removed_student)
+        if self._name_tree is not None:
+            self._name_tree.remove(removed_student.full_name.casefold(), removed_student)
+        position = bisect.bisect_left(self._name_keys, (removed_student.full_name.casefold(),
+                                                        removed_student.student_id))
+        del self._name_keys[position]
+        del self._name_order[position]
+        if self.autosave is not None:
+            self.autosave.mark_removed(removed_student.student_id)
+        self._bump_version()
+        return removed_student
+
+    def _counts_for(self, subject):
+        """
+        Return the 101-slot counter for a subject or for AVERAGE_KEY
+
+        Raises:
+            ValueError: If subject is neither a known subject nor AVERAGE_KEY
+        """
+        if subject == AVERAGE_KEY:
+            return self._average_counts
+        if subject not in self.subjects:
+            raise ValueError(f"Invalid subject. Available subjects: {', '.join(self.subjects)}, {AVERAGE_KEY}")
+        return self._grade_counts.get(subject, [0] * GRADE_BUCKETS)
+
+    def class_summary(self):
+        """
+        Section A class summary read from the maintained counters in O(1)
+        Each student is classified by their average; students with no grades
+        are counted in "students" only
+
+        Returns:
+            dict: "students", "graded", "passed", "failed", "average" (mean of
+                  the students' averages), "results" {Distinction/Pass/Fail: count}
+                  and "letter_grades" {A*..U: count}
+        """
+        results = dict(self._result_counts)
+        graded = sum(results.values())
+        return {
+            "students": len(self.students),
+            "graded": graded,
+            "passed": results["Distinction"] + results["Pass"],
+            "failed": results["Fail"],
+            "average": self._average_total / graded if graded else 0.0,
+            "results": results,
+            "letter_grades": dict(self._letter_counts),
+        }
+
+    def band_bitmap(self, subject=None, band=None):
+        """
+        Bitmap of the students in a subject's grade band (bit i = student id i)
+        Combine bitmaps with & (and), | (or) and band_bitmap() & ~bitmap (not)
+
+        Args:
+            subject (str): Subject name, or None for every student in the roster
+            band (str): Letter grade (A* to U) or Section A result (Distinction,
+                        Pass, Fail, Passed, Failed), case-insensitive
+
+        Returns:
+            int: The bitmap
+
+        Raises:
+            ValueError: If band is not recognised
+        """
+        if subject is None:
+            return int.from_bytes(self._live_bits, "little")
+        letters = BAND_LETTERS.get(str(band).casefold())
+        if letters is None:
+            raise ValueError(f"Invalid band. Available bands: {', '.join(LETTER_GRADES)}, "
+                             f"Distinction, Pass, Fail, Passed, Failed")
+        band_bits = self._band_bits.get(subject)
+        if band_bits is None:
+            return 0
+        bitmap = 0
+        for letter in letters:
+            bitmap |= int.from_bytes(band_bits[LETTER_GRADES.index(letter)], "little")
+        return bitmap
+
+    def students_in_bitmap(self, bitmap):
+        """
+        Turn a band bitmap back into students
+        The roster is kept in id order, so each set bit is found by bisection
+
+        Args:
+            bitmap (int): Bitmap of student ids
+
+        Returns:
+            list: Matching Student objects in roster order
+        """
+        students = self.students
+        matches = []
+        position = previous_id = 0
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        for match in re.finditer(rb"[^\x00]", data):
+            base = match.start() << 3
+            for bit in _BYTE_BITS[data[match.start()]]:
+                student_id = base + bit
+                # Ids are dense unless students were removed, so try the
+                # position implied by the gap first and only bisect on a miss
+                guess = min(position + student_id - previous_id, len(students) - 1)
+                if students[guess].student_id != student_id:
+                    guess = bisect.bisect_left(students, student_id, position, guess + 1,
+                                               key=attrgetter("student_id"))
+                matches.append(students[guess])
+                position, previous_id = guess, student_id
+        return matches
+
+    def band_query(self, text):
+        """
+        Find students with a band query, e.g. "Math is Fail and Science is Passed"
+
+        Args:
+            text (str): Query text (see BandQuery)
+
+        Returns:
+            list: Matching Student objects in roster order
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed or names an unknown subject
+        """
+        return self.students_in_bitmap(BandQuery(text).execute(self))
+
+    def band_count(self, text):
+        """
+        Count the students matching a band query without building the result list
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed or names an unknown subject
+        """
+        return BandQuery(text).execute(self).bit_count()
+
+    def histogram(self, subject):
+        """
+        Exact grade distribution for a subject, read from the maintained counters
+
+        Args:
+            subject (str): Subject name, or AVERAGE_KEY for rounded student averages
+
+        Returns:
+            list: 101 counts - entry g is the number of students with grade g
+
+        Raises:
+            ValueError: If subject is not in available subjects list
+        """
+        return list(self._counts_for(subject))
+
+    def percentile(self, subject, p):
+        """
+        Exact nearest-rank percentile of a subject's grades in O(101)
+
+        Args:
+            subject (str): Subject name, or AVERAGE_KEY for rounded student averages
+            p (float): Percentile between 0 and 100 (50 is the median)
+
+        Returns:
+            int: Smallest grade with at least p% of graded students at or below it,
+                 or None if nobody has a grade in this subject
+
+        Raises:
+            ValueError: If subject is unknown or p is outside 0-100
+        """
+        # Validate percentile range
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+
+        return _percentile_from_counts(self._counts_for(subject), p)
+
+    def query(self, text):
+        """
+        Filter the roster with the query language, e.g.
+        'Math >= 70 and English < 50 and avg between 60 and 80 and name ~ "smi"'
+
+        Args:
+            text (str): Query text (see GradebookQuery)
+
+        Returns:
+            list: Matching Student objects in roster order
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed or names an unknown field
+        """
+        return GradebookQuery(text).execute(self)
+
+    def _query_columns(self):
+        """Column cache for queries, emptied whenever the roster changes"""
+        version, columns = self._query_cache
+        if version != self.version:
+            columns = {}
+            self._query_cache = (self.version, columns)
+        return columns
+
+    def _query_subject(self, field):
+        """Return the subject a query field refers to (case-insensitive), or None"""
+        for subject in self.subjects:
+            if subject.casefold() == field.casefold():
+                return subject
+        return None
+
+    def _query_column(self, subject):
+        """One byte per student: the subject grade, or MISSING_GRADE if ungraded"""
+        columns = self._query_columns()
+        column = columns.get(("subject", subject))
+        if column is None:
+            column = columns[("subject", subject)] = bytes(
+                student.grades.get(subject, MISSING_GRADE) for student in self.students)
+        return column
+
+    def _query_scores(self, key):
+        """One score per student for a ranking key (see score_function)"""
+        columns = self._query_columns()
+        scores = columns.get(("score", key))
+        if scores is None:
+            scores = columns[("score", key)] = list(map(self.score_function(key), self.students))
+        return scores
+
+    def _query_names(self):
+        """
+        All casefolded full names joined by newlines (with a leading and trailing
+        newline), the offset where each student's name starts, and the names list
+        """
+        columns = self._query_columns()
+        names = columns.get("names")
+        if names is None:
+            casefolded = [student.full_name.casefold() for student in self.students]
+            starts = array("Q")
+            position = 1
+            for name in casefolded:
+                starts.append(position)
+                position += len(name) + 1
+            names = columns["names"] = ("\n" + "\n".join(casefolded) + "\n", starts, casefolded)
+        return names
+
+    def search_partial_name(self, partial_name):
+        """
+        Lazily find students whose full name contains the given text (case-insensitive)
+
+        Args:
+            partial_name (str): Text to look for inside full names
+
+        Returns:
+            generator: Matching Student objects in roster order
+        """
+        partial_name = partial_name.lower()
+        return self.iter_students(filter=lambda student: partial_name in student.full_name.lower())
+
+    def search_by_min_average(self, threshold, key="average"):
+        """
+        Lazily find students whose average (or other ranking score) is at least the threshold
+
+        Args:
+            threshold (float): Minimum score
+            key (str): Ranking key - "average", "weighted", "gpa" or "normalized"
+
+        Returns:
+            generator: Matching Student objects in roster order
+
+        Raises:
+            ValueError: If key is not one of SCORE_KEYS
+        """
+        score = self.score_function(key)
+        return self.iter_students(filter=lambda student: score(student) >= threshold)
+
+    def top_students(self, k, descending=True):
+        """
+        Return the k highest (or lowest) students by average without a full sort
+
+        Args:
+            k (int): Number of students to return
+            descending (bool): True for highest averages, False for lowest
+
+        Returns:
+            list: Up to k Student objects, best first
+        """
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(k, self.students, key=Student.get_average)
+
+    def search_student(self, full_name):
+        """
+        Search for a student by name using linear search algorithm
+
+        Args:
+            full_name (str): Full name of student to find
+
+        Returns:
+            Student: Found student object, or None if not found
+
+        Raises:
+            EmptyNameError: If full_name is empty or whitespace
+        """
+        # Validate input
+        if not full_name.strip():
+            raise EmptyNameError("Student name cannot be empty")
+
+        # Linear search implementation - stop at the first match
+        target = full_name.lower().strip()
+        return next(self.iter_students(filter=lambda student: student.full_name.lower() == target),
+                    None)
+
+    def fuzzy_search(self, full_name, max_distance=2):
+        """
+        Typo-tolerant search for students by name using the BK-tree index
+
+        Args:
+            full_name (str): Full name to look up (may be misspelled)
+            max_distance (int): Maximum number of character edits allowed
+
+        Returns:
+            list: (distance, Student) tuples, closest matches first
+
+        Raises:
+            EmptyNameError: If full_name is empty or whitespace
+            ValueError: If max_distance is negative
+        """
+        # Validate input
+        if not full_name.strip():
+            raise EmptyNameError("Student name cannot be empty")
+        if max_distance < 0:
+            raise ValueError("Maximum distance cannot be negative")
+
+        # Build the index once, then keep it in sync on add and remove
+        if self._name_tree is None:
+            self._name_tree = BKTree()
+            for student in self.students:
+                self._name_tree.add(student.full_name.casefold(), student)
+
+        return self._name_tree.search(full_name.strip().casefold(), max_distance)
+
+    def display_all_students(self):
+        """Display all students in the gradebook with their complete information"""
+        # Handle empty gradebook case
+        if not self.students:
+            print("No students in the system.")
+            return
+
+        # Display header and all student records
+        print("\n--- All Student Records ---")
+        for student in self.iter_students():
+            student.display_info()
+
+    def display_subject_grades(self, subject):
+        """
+        Display all students' grades for a specific subject
+
+        Args:
+            subject (str): Subject to display grades for
+
+        Raises:
+            ValueError: If subject is not in available subjects list
+        """
+        # Validate subject input
+        if subject not in self.subjects:
+            raise ValueError(f"Invalid subject. Available subjects: {', '.join(self.subjects)}")
+
+        # Display subject grades header
+        print(f"\n--- {subject} Grades ---")
+
+        # Handle empty gradebook case
+        if not self.students:
+            print("No students in the system.")
+            return
+
+        # Display grades for each student
+        for line in self.iter_students(
+                key=lambda student: f"{student.full_name}: {student.grades.get(subject, 'No grade')}"):
+            print(line)
+
+    def bubble_sort_students_by_average(self, descending=True, key="average"):
+        """
+        Sort students by average grade using bubble sort algorithm
+
+        Args:
+            descending (bool): True for highest first, False for lowest first
+            key (str): Ranking key - "average", "weighted", "gpa" or "normalized"
+
+        Returns:
+            list: Sorted list of Student objects
+
+        Raises:
+            ValueError: If key is not one of SCORE_KEYS
+
+        TESTING NOTE: Bubble sort verified with various student lists
+        """
+        # Serve from the view cache when nothing changed since the last sort
+        return list(self._sorted_by_score(key, descending))
+
+    def _sorted_by_score(self, key, descending):
+        """Cached view of all students ordered by a ranking key (see score_function)"""
+        if key == "average":
+            return self._cached_view(("average", bool(descending)),
+                                     lambda: self._sort_by_average(descending))
+        score = self.score_function(key)
+        return self._cached_view((key, bool(descending)),
+                                 lambda: sorted(self.students, key=score, reverse=descending))
+
+    def _sort_by_average(self, descending):
+        """
+        Sort by average using a counting sort when averages fall in a small domain,
+        falling back to bubble sort otherwise (both are stable, so results match)
+        """
+        sorted_students = self._counting_sort_by_average(descending)
+        if sorted_students is None:
+            sorted_students = self._bubble_sort_by_average(descending)
+        return sorted_students
+
+    def _average_scale(self):
+        """
+        Return the factor that turns every possible average into an integer bucket
+
+        With at most len(subjects) integer grades, an average is sum / count for
+        count <= len(subjects), so multiplying by lcm(1..len(subjects)) makes it exact
+
+        Returns:
+            int: Scale factor, or None if the bucket domain would be too large
+        """
+        scale = math.lcm(*range(1, len(self.subjects) + 1))
+        if scale * 100 + 1 > MAX_COUNTING_BUCKETS:
+            return None
+        return scale
+
+    def _counting_sort_by_average(self, descending):
+        """
+        Stable counting sort of students by exact average, in O(n + buckets)
+
+        Returns:
+            list: Sorted list of Student objects, or None if some average falls
+                  outside the small integer domain (caller must fall back)
+        """
+        scale = self._average_scale()
+        if scale is None:
+            return None
+        max_count = len(self.subjects)
+
+        def bucket_key(student):
+            grades = student.grades
+            if not grades:
+                return 0
+            if len(grades) > max_count:
+                return None
+            return sum(grades.values()) * (scale // len(grades))
+
+        return _counting_sort(self.students, bucket_key, scale * 100 + 1, descending)
+
+    def _bubble_sort_by_average(self, descending):
+        """Bubble sort implementation behind bubble_sort_students_by_average"""
+        # Create copy to avoid modifying original list
+        students_copy = self.students.copy()
+        n = len(students_copy)
+
+        # Bubble sort implementation
+        for i in range(n):
+            for j in range(0, n - i - 1):
+                # Compare adjacent elements based on sort order
+                if descending:
+                    if students_copy[j].get_average() < students_copy[j + 1].get_average():
+                        # Swap elements
+                        students_copy[j], students_copy[j + 1] = students_copy[j + 1], students_copy[j]
+                else:
+                    if students_copy[j].get_average() > students_copy[j + 1].get_average():
+                        # Swap elements
+                        students_copy[j], students_copy[j + 1] = students_copy[j + 1], students_copy[j]
+
+        return students_copy
+
+    def insertion_sort_students_by_name(self):
+        """
+        Students in alphabetical order, read from the maintained name index
+        The index is kept sorted by bisect insertion on every add and remove,
+        so this is an O(n) copy rather than an O(n^2) insertion sort
+
+        Returns:
+            list: Alphabetically sorted list of Student objects (ties in the
+                  order they were added)
+
+        TESTING NOTE: Insertion sort verified with various name combinations
+        """
+        return list(self._name_order)
+
+    def names_with_prefix(self, prefix):
+        """
+        Students whose full name starts with prefix (case-insensitive), A-Z
+
+        Args:
+            prefix (str): Start of the full name, e.g. "Mo"
+
+        Returns:
+            list: Matching Student objects in alphabetical order
+        """
+        prefix = prefix.strip().casefold()
+        start = bisect.bisect_left(self._name_keys, (prefix,))
+        end = bisect.bisect_left(self._name_keys, (prefix + NAME_KEY_END,))
+        return self._name_order[start:end]
+
+    def names_between(self, first, last):
+        """
+        Students whose full name falls alphabetically between first and last
+        (case-insensitive); names starting with last are included, so
+        names_between("A", "F") covers every name from A to F
+
+        Args:
+            first (str): Lower bound of the range
+            last (str): Upper bound of the range (treated as a prefix)
+
+        Returns:
+            list: Matching Student objects in alphabetical order
+        """
+        start = bisect.bisect_left(self._name_keys, (first.strip().casefold(),))
+        end = bisect.bisect_left(self._name_keys, (last.strip().casefold() + NAME_KEY_END,))
+        return self._name_order[start:end]
+
+    def sort_students_by_subject(self, subject):
+        """
+        Sort students by grade in a specific subject using built-in sorted
+
+        Args:
+            subject (str): Subject to sort by
+
+        Returns:
+            list: Students sorted by subject grade (highest first)
+
+        Raises:
+            ValueError: If subject is not in available subjects list
+        """
+        # Validate subject input
+        if subject not in self.subjects:
+            raise ValueError(f"Invalid subject. Available subjects: {', '.join(self.subjects)}")
+
+        # Sort by subject grade (memoized per subject)
+        return list(self._cached_view(("subject", subject),
+                                      lambda: self._sort_by_subject(subject)))
+
+    def _sort_by_subject(self, subject):
+        """
+        Sort by one subject's grade - counting sort over the 101 possible grades,
+        with Python's built-in sorted as the fallback for non-integer grades
+        """
+        sorted_students = _counting_sort(self.students,
+                                         lambda student: student.grades.get(subject, 0),
+                                         GRADE_BUCKETS, descending=True)
+        if sorted_students is None:
+            sorted_students = sorted(self.students,
+                                     key=lambda student: student.grades.get(subject, 0),
+                                     reverse=True)
+        return sorted_students
+
+    def export(self, path, format="csv", compress=True, chunk_size=10_000):
+        """
+        Stream the gradebook to a CSV or JSON Lines file, optionally gzip-compressed
+
+        Each row holds the name, one column per subject in self.subjects, the
+        average and the letter grade. Rows are formatted chunk_size at a time and
+        written with one call per chunk, so memory stays constant for any roster.
+        Compression uses the fastest gzip level to keep the export disk-bound.
+
+        Args:
+            path (str): Destination file path (add .gz yourself when compressing)
+            format (str): "csv" or "jsonl"
+            compress (bool): True to gzip the output
+            chunk_size (int): Number of rows formatted per write
+
+        Returns:
+            int: Number of students exported
+
+        Raises:
+            ValueError: If format is not supported or chunk_size is not positive
+        """
+        # Validate export options
+        if format not in ("csv", "jsonl"):
+            raise ValueError("Export format must be 'csv' or 'jsonl'")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number")
+
+        header = ["name", *self.subjects, "average", "letter_grade"]
+        subjects = list(self.subjects)
+
+        def export_row(student):
+            average = student.get_average()
+            return [student.full_name, *(student.grades.get(subject) for subject in subjects),
+                    round(average, 2), letter_grade(average)]
+
+        raw = gzip.open(path, "wb", compresslevel=1) if compress else open(path, "wb")
+        exported = 0
+        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as stream:
+            rows = self.iter_students(key=export_row)
+            if format == "csv":
+                csv.writer(stream).writerow(header)
+
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+
+                # Format the whole chunk in memory, then hand it over in one write
+                if format == "csv":
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(chunk)
+                    stream.write(buffer.getvalue())
+                else:
+                    stream.write("".join(json.dumps(dict(zip(header, row))) + "\n" for row in chunk))
+                exported += len(chunk)
+
+        return exported
+
+    def export_npz(self, path):
+        """
+        Export the roster as columnar NumPy arrays in an uncompressed .npz file
+
+        Arrays written:
+            first_names, surnames - name string tables (one entry per student)
+            grades  - uint8 matrix, one row per student, one column per subject
+            missing - bool matrix, True where the student has no grade
+            subjects - column labels for grades/missing (Gradebook.subjects)
+
+        The archive is left uncompressed so that from_npz can memory-map it
+
+        Args:
+            path (str): Destination file path (.npz is added if missing)
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import numpy as np  # Optional dependency - only needed for .npz files
+
+        # np.savez adds .npz itself - add it here so both methods use the same name
+        path = _npz_path(path)
+        count = len(self.students)
+        grades = np.zeros((count, len(self.subjects)), dtype=np.uint8)
+        missing = np.ones((count, len(self.subjects)), dtype=bool)
+
+        # Fill the grade matrix column by column
+        for column, subject in enumerate(self.subjects):
+            column_grades = [student.grades.get(subject) for student in self.students]
+            present = np.fromiter((grade is not None for grade in column_grades),
+                                  dtype=bool, count=count)
+            grades[present, column] = [grade for grade in column_grades if grade is not None]
+            missing[:, column] = ~present
+
+        np.savez(path,
+                 first_names=np.array([student.first_name for student in self.students], dtype=str),
+                 surnames=np.array([student.surname for student in self.students], dtype=str),
+                 grades=grades,
+                 missing=missing,
+                 subjects=np.array(self.subjects, dtype=str))
+
+    @classmethod
+    def from_npz(cls, path, mmap=True):
+        """
+        Build a Gradebook from a file written by export_npz
+
+        Args:
+            path (str): Path to the .npz file (.npz is added if missing)
+            mmap (bool): Memory-map the grade and missing matrices instead of
+                         reading them into memory (uncompressed archives only)
+
+        Returns:
+            Gradebook: New gradebook holding the loaded students
+
+        Raises:
+            ImportError: If NumPy is not installed
+            KeyError: If the file is missing one of the expected arrays
+        """
+        import numpy as np  # Optional dependency - only needed for .npz files
+
+        path = _npz_path(path)
+        with np.load(path) as archive:
+            first_names = archive["first_names"].tolist()
+            surnames = archive["surnames"].tolist()
+            subjects = archive["subjects"].tolist()
+            grades = missing = None
+            if mmap:
+                grades = _memmap_npz_member(path, "grades")
+                missing = _memmap_npz_member(path, "missing")
+            if grades is None or missing is None:
+                grades = archive["grades"]
+                missing = archive["missing"]
+
+        gradebook = cls()
+        gradebook.subjects = subjects
+
+        # Convert one column at a time to plain Python ints
+        grade_columns = [grades[:, column].tolist() for column in range(len(subjects))]
+        missing_columns = [missing[:, column].tolist() for column in range(len(subjects))]
+
+        with _paused_gc():
+            students = []
+            for row, (first_name, surname) in enumerate(zip(first_names, surnames)):
+                student = Student(first_name, surname)
+                for column, subject in enumerate(subjects):
+                    if not missing_columns[column][row]:
+                        student.grades[subject] = grade_columns[column][row]
+                students.append(student)
+            gradebook._attach_many(students)
+        return gradebook
+
+    @classmethod
+    def from_tuples(cls, records, subjects=None):
+        """
+        Build a Gradebook from Section B data: a list of (name, [grades]) tuples
+
+        Args:
+            records (iterable): (full name, list of grades) tuples; grades are in
+                                the same order as subjects
+            subjects (list): Subjects the grade lists refer to
+                             (defaults to Math, English, Science)
+
+        Returns:
+            Gradebook: New gradebook holding the converted students
+
+        Raises:
+            EmptyNameError: If a name has no first name or no surname
+            InvalidGradeError: If a grade is not an integer between 0 and 100,
+                               or a record has more grades than subjects
+        """
+        gradebook = cls()
+        if subjects is not None:
+            gradebook.subjects = list(subjects)
+        subjects = gradebook.subjects
+
+        with _paused_gc():
+            students = []
+            for row, (name, grades) in enumerate(records, start=1):
+                if len(grades) > len(subjects):
+                    raise InvalidGradeError(f"Record {row} ({name}): {len(grades)} grades "
+                                            f"for {len(subjects)} subjects")
+                # Zipped with subjects, so every subject is known
+                students.append(_student_from_record(row, name, zip(subjects, grades)))
+
+            # Register every student with the indexes in one pass
+            gradebook._attach_many(students)
+        return gradebook
+
+    @classmethod
+    def from_dict(cls, records, subjects=None):
+        """
+        Build a Gradebook from Section C/D data: a {name: {subject: mark}} dictionary
+
+        Args:
+            records (dict): {full name: {subject: mark}}
+            subjects (list): Available subjects (defaults to Math, English, Science)
+
+        Returns:
+            Gradebook: New gradebook holding the converted students
+
+        Raises:
+            EmptyNameError: If a name has no first name or no surname
+            InvalidGradeError: If a mark is not an integer between 0 and 100
+            ValueError: If a mark is for a subject not in subjects
+        """
+        gradebook = cls()
+        if subjects is not None:
+            gradebook.subjects = list(subjects)
+
+        with _paused_gc():
+            students = [_student_from_record(row, name, grades.items(), gradebook.subjects)
+                        for row, (name, grades) in enumerate(records.items(), start=1)]
+
+            # Register every student with the indexes in one pass
+            gradebook._attach_many(students)
+        return gradebook
+
+    def validate(self, records, update=False):
+        """
+        Validate candidate records against this gradebook without changing it
+
+        Args:
+            records (dict or iterable): {full name: {subject: grade}} or
+                                        (full name, {subject: grade}) pairs
+            update (bool): True if the records update existing students' grades
+
+        Returns:
+            ValidationReport: Structured report of every error found
+        """
+        existing_names = {student.full_name.casefold() for student in self.students}
+        with _paused_gc():
+            return validate_records(records, self.subjects, existing_names, update)
+
+    def bulk_add(self, records):
+        """
+        Validate a batch of new students and add every valid one in a single step
+        Invalid records are skipped and listed in the report instead of raising
+
+        Args:
+            records (dict or iterable): {full name: {subject: grade}} or
+                                        (full name, {subject: grade}) pairs
+
+        Returns:
+            ValidationReport: Report of the batch (report.valid were added)
+        """
+        report = self.validate(records)
+        with _paused_gc():
+            students = []
+            for _, first_name, surname, grades in report.valid:
+                student = Student(first_name, surname)
+                student.grades = dict(grades)
+                students.append(student)
+            self._attach_many(students)
+        return report
+
+    def bulk_update(self, records):
+        """
+        Validate a batch of grade updates and apply every valid one
+        Invalid records are skipped and listed in the report instead of raising
+
+        Args:
+            records (dict or iterable): {full name: {subject: grade}} or
+                                        (full name, {subject: grade}) pairs
+
+        Returns:
+            ValidationReport: Report of the batch (report.valid were applied)
+        """
+        report = self.validate(records, update=True)
+        students = {student.full_name.casefold(): student for student in self.students}
+        for _, first_name, surname, grades in report.valid:
+            student = students[f"{first_name} {surname}".casefold()]
+            for subject, grade in grades.items():
+                student.add_grade(subject, grade)
+        return report
+
+    def group_by(self, key):
+        """
+        Start a hash group-by over the roster (see GroupBy)
+
+        Args:
+            key (callable or str): Function returning a student's group, a name from
+                                   GROUP_FIELDS (surname_initial, first_initial,
+                                   letter_grade, result) or a Student attribute name
+                                   such as a class or year set by the caller
+
+        Returns:
+            GroupBy: Call .aggregate(...) on it to compute the breakdown
+        """
+        return GroupBy(self.students, key)
+
+    def _group_partition(self, key):
+        """Partial group states for this roster, used by a ShardedGradebook's group-by"""
+        return _aggregate_partition(self.students, GroupBy(self.students, key).key)
+
+    def memory_report(self, include_peaks=True):
+        """
+        Attribute the gradebook's memory to its components using deep sys.getsizeof
+        traversal, and optionally measure peak allocations of sorts and searches
+        with tracemalloc
+
+        Every object is counted once, in the first component that reaches it
+        (e.g. subject-name strings are shared by all grade dictionaries)
+
+        Args:
+            include_peaks (bool): Also run a sort and search under tracemalloc
+
+        Returns:
+            dict: {"students": count, "components": {name: bytes}, "total_bytes": int,
+                   "bytes_per_student": float, "peaks": {operation: bytes},
+                   "traced_bytes": bytes currently traced (if tracemalloc is running)}
+        """
+        seen = set()
+        students = self.students
+        components = {
+            "roster_list": _deep_sizeof(students, seen, follow=False),
+            "student_objects": sum(_deep_sizeof(student, seen, follow=False)
+                                   + _deep_sizeof(student.__dict__, seen, follow=False)
+                                   for student in students),
+            "grade_dicts": sum(_deep_sizeof(student.grades, seen) for student in students),
+            "name_strings": sum(_deep_sizeof(student.first_name, seen)
+                                + _deep_sizeof(student.surname, seen) for student in students),
+            "grade_history": _deep_sizeof(self.history.__dict__, seen),
+            "grade_counters": _deep_sizeof(self._grade_counts, seen)
+                              + _deep_sizeof(self._average_counts, seen)
+                              + _deep_sizeof(self._letter_counts, seen)
+                              + _deep_sizeof(self._result_counts, seen),
+            "view_cache": _deep_sizeof(self._view_cache, seen),
+            "name_index": _deep_sizeof(self._name_tree.root if self._name_tree else None, seen),
+            "band_bitmaps": _deep_sizeof(self._live_bits, seen) + _deep_sizeof(self._band_bits, seen),
+            "name_order": _deep_sizeof(self._name_keys, seen)
+                          + _deep_sizeof(self._name_order, seen, follow=False),
+            "gpa_cache": _deep_sizeof(self.gpa_engine.__dict__, seen),
+            "normalization_cache": _deep_sizeof(self.normalizer.__dict__, seen),
+            "render_cache": _deep_sizeof(self.render_cache._entries, seen, follow=False)
+                            + sum(_deep_sizeof(entry, seen)
+                                  for entry in self.render_cache._entries.values()),
+        }
+        total = sum(components.values())
+
+        report = {
+            "students": len(students),
+            "components": components,
+            "total_bytes": total,
+            "bytes_per_student": total / len(students) if students else 0,
+        }
+        if include_peaks:
+            report["peaks"] = self._measure_peaks()
+        if tracemalloc.is_tracing():
+            report["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+        return report
+
+    def _measure_peaks(self):
+        """
+        Run representative sorts and searches under tracemalloc and record the
+        peak extra memory each one allocates
+
+        Returns:
+            dict: {operation: peak bytes allocated while it ran}
+        """
+        subject = self.subjects[0] if self.subjects else None
+        operations = {
+            # Plain sorted() - the bubble-sort fallback would stall on large rosters
+            "sort_by_average": lambda: sorted(self.students, key=Student.get_average, reverse=True),
+            "sort_by_subject": lambda: self._sort_by_subject(subject) if subject else None,
+            "partial_name_search": lambda: sum(1 for _ in self.search_partial_name("a")),
+            "threshold_search": lambda: sum(1 for _ in self.search_by_min_average(50)),
+            "top_10": lambda: self.top_students(10),
+        }
+
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        peaks = {}
+        try:
+            for name, operation in operations.items():
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                operation()
+                peaks[name] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        return peaks
+
+    def export_memory_report(self, path, include_peaks=True):
+        """
+        Write memory_report() to a JSON file
+
+        Args:
+            path (str): Destination file path
+            include_peaks (bool): Also measure sort/search peaks
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.memory_report(include_peaks), file, indent=2)
+
+    @classmethod
+    def open_store(cls, path):
+        """
+        Load a gradebook saved with save_incremental and keep saving to the same store
+
+        Args:
+            path (str): Path to the store file
+
+        Returns:
+            Gradebook: Loaded gradebook with no unsaved changes
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a valid gradebook store
+        """
+        gradebook = cls()
+        store = GradebookStore(path)
+        with _paused_gc():
+            students = store.load_students()
+            for student in students:
+                student.dirty = False
+            gradebook._attach_many(students)
+
+        # Ids are reassigned on load, so rewrite the store once under the new ids
+        store.compact(gradebook.students)
+        gradebook.store = store
+        return gradebook
+
+    def save_incremental(self, path=None, overwrite=False):
+        """
+        Save only what changed since the last save: added and regraded students
+        are appended to the store and removed students get a tombstone record,
+        so a save after one edit costs O(changes), not O(roster)
+
+        Args:
+            path (str): Store file to use on the first save (ignored afterwards)
+            overwrite (bool): True to let the first save replace an existing,
+                              non-empty file at path
+
+        Returns:
+            int: Number of records written
+
+        Raises:
+            ValueError: If no store is open and no path was given
+            FileExistsError: If the first save would replace a non-empty file
+                             and overwrite is False
+            OSError: If the store cannot be written
+        """
+        if self.store is None:
+            if path is None:
+                raise ValueError("No save file chosen - provide a path")
+            # Never wipe someone's existing store (or any other file) silently
+            if not overwrite and os.path.exists(path) and os.path.getsize(path) > 0:
+                raise FileExistsError(f"{path} already exists and is not empty")
+            # First save of this gradebook - start a fresh store holding everyone,
+            # written in roster order so a reload gives the same order back
+            self.store = GradebookStore(path, truncate=True)
+            self._dirty_students = dict.fromkeys(self.students)
+
+        written = self.store.append(self._dirty_students, self._removed_ids)
+        for student in self._dirty_students:
+            student.dirty = False
+        self._dirty_students.clear()
+        self._removed_ids.clear()
+
+        # Rewrite the store once superseded records dominate it
+        if self.store.needs_compaction():
+            self.store.compact(self.students)
+        return written
+
+    @property
+    def has_unsaved_changes(self):
+        """True if any student was added, removed or regraded since the last save"""
+        return bool(self._dirty_students or self._removed_ids)
+
+    def grades_as_of(self, when):
+        """
+        Reconstruct the whole roster's grades at a point in time from the history
+
+        Args:
+            when (float or datetime): Point in time (inclusive)
+
+        Returns:
+            dict: {student id: (full name, {subject: grade})} for every student on
+                  the roster at that time, including students removed since
+                  (keyed by id, so a removed and a re-added student with the
+                  same name stay separate)
+        """
+        return {student_id: (self.history.names[student_id], grades)
+                for student_id, grades in self.history.grades_as_of(when).items()}
+
+    def grade_history(self, full_name):
+        """
+        Return the audit trail of grade changes for one student
+
+        Args:
+            full_name (str): Full name of the student
+
+        Returns:
+            list: (timestamp, subject, grade) tuples, oldest first
+
+        Raises:
+            EmptyNameError: If full_name is empty or whitespace
+            StudentNotFoundError: If student not found in system
+        """
+        student = self.search_student(full_name)
+        if student is None:
+            raise StudentNotFoundError(f"Student '{full_name}' not found")
+        return self.history.change_log(student.student_id)
+
+    def __len__(self):
+        """Return the number of students in the gradebook"""
+        return len(self.students)
+
+    def _view_list(self, view):
+        """
+        Resolve a view name to the underlying ordered list without copying it
+
+        Args:
+            view (str): "all" (insertion order), a ranking key from SCORE_KEYS
+                        (highest first) or the same key with "_asc" (lowest first),
+                        "name" (A-Z) or a subject name
+
+        Returns:
+            list: Students in view order (treat as read-only)
+
+        Raises:
+            ValueError: If the view name is not recognised
+        """
+        if view == "all":
+            return self.students
+        if view in SCORE_KEYS:
+            return self._sorted_by_score(view, True)
+        if view.endswith("_asc") and view[:-len("_asc")] in SCORE_KEYS:
+            return self._sorted_by_score(view[:-len("_asc")], False)
+        if view == "name":
+            return self._name_order
+        if view in self.subjects:
+            return self._cached_view(("subject", view), lambda: self._sort_by_subject(view))
+        raise ValueError(f"Invalid view. Available views: all, {', '.join(SCORE_KEYS)} "
+                         f"(add _asc for lowest first), name, "
+                         f"{', '.join(self.subjects)}")
+
+    def page(self, view="all", cursor=0, size=20):
+        """
+        Return one page of a student listing or sorted view
+
+        Only the requested slice is copied, so the first screen of a huge roster
+        costs O(size); sorted views come from the version-checked view cache
+
+        Args:
+            view (str): View name (see _view_list)
+            cursor (int): Position of the first student on the page
+            size (int): Maximum number of students per page
+
+        Returns:
+            tuple: (list of Students on this page, cursor of the next page or None,
+                    cursor of the previous page or None)
+
+        Raises:
+            ValueError: If the view is unknown, size is not positive or cursor is negative
+        """
+        # Validate paging parameters
+        if size <= 0:
+            raise ValueError("Page size must be a positive number")
+        if cursor < 0:
+            raise ValueError("Cursor cannot be negative")
+
+        students = self._view_list(view)
+        page_students = students[cursor:cursor + size]
+
+        next_cursor = cursor + size if cursor + size < len(students) else None
+        previous_cursor = max(cursor - size, 0) if cursor > 0 else None
+        return page_students, next_cursor, previous_cursor
+
+
+def result_band(mark):
+    """
+    Classify a mark or average into the Section A Distinction/Pass/Fail result
+
+    Args:
+        mark (float): Mark or average between 0 and 100
+
+    Returns:
+        str: "Distinction" (70+), "Pass" (50-69) or "Fail" (below 50)
+    """
+    if mark >= 70:
+        return "Distinction"
+    elif mark >= 50:
+        return "Pass"
+    return "Fail"
+
+
+# Section A results, best first (Distinction and Pass both count as passed)
+RESULT_BANDS = ("Distinction", "Pass", "Fail")
+
+
+# Built-in group_by fields; any other name is read as a Student attribute
+GROUP_FIELDS = {
+    "surname_initial": lambda student: student.surname[:1].upper(),
+    "first_initial": lambda student: student.first_name[:1].upper(),
+    # Students with no grades have no letter grade or result (see class_summary)
+    "letter_grade": lambda student: letter_grade(student.get_average()) if student.grades else "Ungraded",
+    "result": lambda student: result_band(student.get_average()) if student.grades else "Ungraded",
+}
+
+# Data handed to forked aggregation workers (inherited, not pickled)
+_AGGREGATION_SOURCE = None
+
+
+class GroupBy:
+    """
+    Hash group-by over a gradebook roster, e.g.
+        gradebook.group_by("surname_initial").aggregate("count", "passed", "average", "max:Math")
+
+    All aggregates are computed in a single pass that keeps one small partial
+    state per group in a dictionary. Large rosters can be split into
+    partitions that are aggregated in parallel worker processes and merged.
+
+    Aggregates: count, graded, passed, failed, average (mean of student averages),
+    and min:<subject>, max:<subject>, mean:<subject> for any subject. As in
+    Gradebook.class_summary, students with no grades are only counted in count.
+    """
+
+    def __init__(self, students, key):
+        """
+        Args:
+            students (list): Students to group
+            key (callable or str): Function returning a student's group, a name
+                                   from GROUP_FIELDS, or a Student attribute name
+        """
+        self.students = students
+        if callable(key):
+            self.key = key
+        elif key in GROUP_FIELDS:
+            self.key = GROUP_FIELDS[key]
+        else:
+            self.key = lambda student: getattr(student, key, None)
+
+    def aggregate(self, *aggregates, workers=1):
+        """
+        Compute the requested aggregates for every group
+
+        Args:
+            *aggregates (str): Aggregate names (defaults to count, passed, failed, average)
+            workers (int): Number of worker processes for partitioned aggregation
+
+        Returns:
+            dict: {group: {aggregate name: value}}
+
+        Raises:
+            ValueError: If an aggregate name is not recognised
+        """
+        aggregates = aggregates or ("count", "passed", "failed", "average")
+        for name in aggregates:
+            if name not in ("count", "graded", "passed", "failed", "average") and \
+                    name.partition(":")[0] not in ("min", "max", "mean"):
+                raise ValueError(f"Unknown aggregate '{name}'")
+
+        # Partial states from one pass (or one pass per partition)
+        partials = self._partials(workers)
+
+        # Merge partial states group by group
+        merged = {}
+        for partial in partials:
+            for group, state in partial.items():
+                if group in merged:
+                    _merge_group_state(merged[group], state)
+                else:
+                    merged[group] = state
+
+        return {group: {name: _finish_aggregate(state, name) for name in aggregates}
+                for group, state in merged.items()}
+
+    def _partials(self, workers):
+        """Partial group states: one pass, or one pass per partition in worker processes"""
+        if workers > 1 and len(self.students) > workers and \
+                "fork" in multiprocessing.get_all_start_methods():
+            return self._parallel_partials(workers)
+        return [_aggregate_partition(self.students, self.key)]
+
+    def _parallel_partials(self, workers):
+        """Aggregate equal slices of the roster in forked worker processes"""
+        global _AGGREGATION_SOURCE
+        size = math.ceil(len(self.students) / workers)
+        ranges = [(start, min(start + size, len(self.students)))
+                  for start in range(0, len(self.students), size)]
+
+        # Workers inherit the roster through fork, so only the small partial
+        # states travel back through the pool
+        _AGGREGATION_SOURCE = (self.students, self.key)
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                return pool.map(_aggregate_range, ranges)
+        finally:
+            _AGGREGATION_SOURCE = None
+
+
+class _ShardedGroupBy(GroupBy):
+    """GroupBy whose partial states are computed by the shards of a ShardedGradebook"""
+
+    def __init__(self, gradebook, key):
+        """
+        Args:
+            gradebook (ShardedGradebook): Gradebook whose shards hold the students
+            key (str): Name from GROUP_FIELDS or a Student attribute name
+        """
+        self.gradebook = gradebook
+        self.field = key
+        super().__init__([], key)
+
+    def _partials(self, workers):
+        """One aggregation pass per shard, run in the shards' worker processes"""
+        return self.gradebook._call_all("_group_partition", self.field)
+
+
+def _aggregate_range(bounds):
+    """Pool task: aggregate one slice of the roster shared through fork"""
+    students, key = _AGGREGATION_SOURCE
+    start, end = bounds
+    return _aggregate_partition(islice(students, start, end), key)
+
+
+def _aggregate_partition(students, key):
+    """
+    One hash-aggregation pass over a partition
+
+    Returns:
+        dict: {group: [count, graded, passed, failed, sum of averages,
+                       {subject: [min, max, sum, graded count]}]}
+    """
+    groups = {}
+    for student in students:
+        group = key(student)
+        state = groups.get(group)
+        if state is None:
+            state = groups[group] = [0, 0, 0, 0, 0.0, {}]
+
+        state[0] += 1
+        if not student.grades:
+            # Ungraded students have no result, as in class_summary
+            continue
+        average = student.get_average()
+        state[1] += 1
+        if average >= 50:
+            state[2] += 1
+        else:
+            state[3] += 1
+        state[4] += average
+
+        subject_stats = state[5]
+        for subject, grade in student.grades.items():
+            stats = subject_stats.get(subject)
+            if stats is None:
+                subject_stats[subject] = [grade, grade, grade, 1]
+            else:
+                if grade < stats[0]:
+                    stats[0] = grade
+                if grade > stats[1]:
+                    stats[1] = grade
+                stats[2] += grade
+                stats[3] += 1
+    return groups
+
+
+def _merge_group_state(target, other):
+    """Fold another partition's state for the same group into target"""
+    for position in range(5):
+        target[position] += other[position]
+    for subject, stats in other[5].items():
+        existing = target[5].get(subject)
+        if existing is None:
+            target[5][subject] = stats
+        else:
+            existing[0] = min(existing[0], stats[0])
+            existing[1] = max(existing[1], stats[1])
+            existing[2] += stats[2]
+            existing[3] += stats[3]
+
+
+def _finish_aggregate(state, name):
+    """Turn a merged group state into the value of one aggregate"""
+    if name == "count":
+        return state[0]
+    if name == "graded":
+        return state[1]
+    if name == "passed":
+        return state[2]
+    if name == "failed":
+        return state[3]
+    if name == "average":
+        return state[4] / state[1] if state[1] else 0
+
+    function, _, subject = name.partition(":")
+    stats = state[5].get(subject)
+    if stats is None:
+        return None
+    if function == "min":
+        return stats[0]
+    if function == "max":
+        return stats[1]
+    return stats[2] / stats[3]
+
+
+def display_group_summary(gradebook, key):
+    """
+    Print a Section A style class summary for every group of students
+
+    Args:
+        gradebook (Gradebook): Gradebook to summarise
+        key (str or callable): Grouping passed to Gradebook.group_by
+    """
+    aggregates = ["count", "graded", "passed", "failed", "average"]
+    for subject in gradebook.subjects:
+        aggregates += [f"min:{subject}", f"max:{subject}"]
+    summary = gradebook.group_by(key).aggregate(*aggregates)
+
+    if not summary:
+        print("No students in the system.")
+        return
+
+    print(f"\n--- Class Summary by {key} ---")
+    for group in sorted(summary, key=str):
+        result = summary[group]
+        print(f"\n{group}: {result['count']} student(s)")
+        if not result["graded"]:
+            print("  No grades recorded.")
+            continue
+        print(f"  Passed: {result['passed']}, Failed: {result['failed']}")
+        print(f"  Average: {result['average']:.2f}")
+        for subject in gradebook.subjects:
+            if result[f"min:{subject}"] is not None:
+                print(f"  {subject} - Highest: {result[f'max:{subject}']}, "
+                      f"Lowest: {result[f'min:{subject}']}")
+
+
+def _deep_sizeof(obj, seen, follow=True):
+    """
+    Size in bytes of an object and everything it contains, counting each object once
+
+    Student objects are never followed into (their gradebook would pull in
+    everything), so containers holding students only count the references
+
+    Args:
+        obj: Object to measure
+        seen (set): ids of objects already counted - shared across calls
+        follow (bool): False to count only the object itself, not its contents
+
+    Returns:
+        int: Bytes not already counted by an earlier call
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if not follow or isinstance(obj, (Student, str, bytes, int, float, array)):
+        return size
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_sizeof(key, seen) + _deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _deep_sizeof(item, seen)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+def display_memory_report(report):
+    """
+    Print a memory_report() dictionary as a table
+
+    Args:
+        report (dict): Result of Gradebook.memory_report()
+    """
+    print("\n--- Gradebook Memory Report ---")
+    print(f"Students: {report['students']}")
+    for name, size in sorted(report["components"].items(), key=itemgetter(1), reverse=True):
+        share = 100 * size / report["total_bytes"] if report["total_bytes"] else 0
+        print(f"  {name:<20} {size:>14,} bytes  ({share:5.1f}%)")
+    print(f"Total: {report['total_bytes']:,} bytes "
+          f"({report['bytes_per_student']:.1f} bytes per student)")
+
+    if "peaks" in report:
+        print("\nPeak extra memory during operations:")
+        for name, size in report["peaks"].items():
+            print(f"  {name:<20} {size:>14,} bytes")
+
+
+@contextmanager
+def _paused_gc():
+    """
+    Pause the cyclic garbage collector while bulk-creating objects
+    Millions of new Student objects would otherwise trigger repeated full
+    collections that scan the whole (acyclic) roster for nothing
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _student_from_record(row, name, grades, subjects=None):
+    """
+    Build a validated Student from a bulk-load record
+
+    Args:
+        row (int): Record number, used in error messages
+        name (str): Full name - first word is the first name, the rest the surname
+        grades (iterable): (subject, grade) pairs
+        subjects (list): Subjects a grade may be given for (None skips the check)
+
+    Returns:
+        Student: New student (not yet attached to a gradebook)
+
+    Raises:
+        EmptyNameError: If the name has no first name or no surname
+        InvalidGradeError: If a grade is not an integer between 0 and 100
+        ValueError: If a grade is for a subject not in subjects
+    """
+    parts = name.split(None, 1)
+    if len(parts) < 2:
+        raise EmptyNameError(f"Record {row}: '{name}' needs a first name and a surname")
+    student = Student(parts[0], parts[1])
+
+    for subject, grade in grades:
+        if subjects is not None and subject not in subjects:
+            raise ValueError(f"Record {row} ({name}): Invalid subject. "
+                             f"Available subjects: {', '.join(subjects)}")
+        if type(grade) is not int or grade < 0 or grade > 100:
+            raise InvalidGradeError(f"Record {row} ({name}): {subject} grade must be "
+                                    f"an integer between 0 and 100")
+        student.grades[subject] = grade
+    return student
+
+
+class ValidationReport:
+    """
+    Result of validating a batch of candidate records
+    Errors are (row, kind, message) tuples in row order, where kind is one of
+    "name", "grades", "grade_type", "grade_range", "unknown_subject", "duplicate"
+    or "not_found". Rows are numbered from 1 in input order.
+    """
+
+    def __init__(self, total, errors, valid):
+        """
+        Args:
+            total (int): Number of records checked
+            errors (list): (row, kind, message) tuples
+            valid (list): (row, first name, surname, grades) of every error-free record
+        """
+        self.total = total
+        self.errors = sorted(errors, key=itemgetter(0))
+        self.valid = valid
+
+    def __len__(self):
+        """Return the number of errors found"""
+        return len(self.errors)
+
+    @property
+    def ok(self):
+        """True if every record passed validation"""
+        return not self.errors
+
+    def error_rows(self):
+        """Return the sorted row numbers that have at least one error"""
+        return sorted({row for row, _, _ in self.errors})
+
+    def counts(self):
+        """Return {kind: number of errors} for the kinds that occurred"""
+        counts = {}
+        for _, kind, _ in self.errors:
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def format(self, limit=20):
+        """
+        Render a short human-readable report
+
+        Args:
+            limit (int): Maximum number of individual errors to list
+
+        Returns:
+            str: Summary line, per-kind counts and the first `limit` errors
+        """
+        lines = [f"{self.total} record(s) checked: {len(self.valid)} valid, "
+                 f"{len(self.error_rows())} with errors"]
+        if self.errors:
+            lines.append("Errors by type: " + ", ".join(f"{kind}: {count}"
+                                                        for kind, count in self.counts().items()))
+            lines += [f"  Row {row}: {message}" for row, _, message in self.errors[:limit]]
+            if len(self.errors) > limit:
+                lines.append(f"  ... and {len(self.errors) - limit} more")
+        return "\n".join(lines)
+
+
+def validate_records(records, subjects, existing_names=frozenset(), update=False):
+    """
+    Check a batch of candidate records at once and report every problem found
+    Nothing is raised per record: names, duplicates and subjects are checked in
+    one pass, and all grades are type- and range-checked together with C-level
+    builtins (set/min/max over one flat list); rows are only re-scanned one by
+    one when that batch check finds a bad grade.
+
+    Args:
+        records (dict or iterable): {full name: {subject: grade}} or
+                                    (full name, {subject: grade}) pairs
+        subjects (iterable): Subjects a grade may be given for
+        existing_names (set): Casefolded full names already in the gradebook
+        update (bool): False for new students (existing names are duplicates),
+                       True for grade updates (names must already exist)
+
+    Returns:
+        ValidationReport: Structured report of every error found
+    """
+    if isinstance(records, dict):
+        records = records.items()
+    subjects = set(subjects)
+    errors = []
+    candidates = []  # (row, first name, surname, grades) with a valid name and subjects
+    first_rows = {}  # casefolded full name -> first row it appeared on
+    all_grades = []
+
+    total = 0
+    for row, (name, grades) in enumerate(records, start=1):
+        total = row
+        parts = name.split(None, 1) if isinstance(name, str) else []
+        if len(parts) < 2:
+            errors.append((row, "name", f"'{name}' needs a first name and a surname"))
+            continue
+
+        # Duplicates within the batch, then against the gradebook
+        key = f"{parts[0]} {parts[1].strip()}".casefold()
+        row_ok = True
+        if key in first_rows:
+            errors.append((row, "duplicate", f"{name} already appears on row {first_rows[key]}"))
+            row_ok = False
+        else:
+            first_rows[key] = row
+            if update and key not in existing_names:
+                errors.append((row, "not_found", f"Student '{name}' not found"))
+                row_ok = False
+            elif not update and key in existing_names:
+                errors.append((row, "duplicate", f"Student {name} already exists"))
+                row_ok = False
+
+        # Anything but a mapping (None, a bare list of grades...) cannot be checked further
+        if not isinstance(grades, dict):
+            errors.append((row, "grades", f"{name}: grades must be a {{subject: grade}} mapping"))
+            continue
+
+        if not subjects.issuperset(grades):
+            for subject in grades:
+                if subject not in subjects:
+                    errors.append((row, "unknown_subject", f"{name}: unknown subject '{subject}'"))
+            row_ok = False
+
+        all_grades.extend(grades.values())
+        candidates.append((row, parts[0], parts[1].strip(), grades, row_ok))
+
+    # Batch grade check - only scan row by row if some grade is bad
+    bad_rows = set()
+    if all_grades and (set(map(type, all_grades)) != {int}
+                       or min(all_grades) < 0 or max(all_grades) > 100):
+        for row, _, _, grades, _ in candidates:
+            for subject, grade in grades.items():
+                if type(grade) is not int:
+                    errors.append((row, "grade_type", f"{subject} grade {grade!r} is not an integer"))
+                    bad_rows.add(row)
+                elif grade < 0 or grade > 100:
+                    errors.append((row, "grade_range", f"{subject} grade {grade} is outside 0-100"))
+                    bad_rows.add(row)
+
+    valid = [(row, first_name, surname, grades)
+             for row, first_name, surname, grades, row_ok in candidates
+             if row_ok and row not in bad_rows]
+    return ValidationReport(total, errors, valid)
+
+
+def _percentile_from_counts(counts, p):
+    """
+    Nearest-rank percentile over a 101-slot grade counter
+
+    Args:
+        counts (list): Entry g is the number of students with grade g
+        p (float): Percentile between 0 and 100
+
+    Returns:
+        int: Percentile grade, or None if the counter is empty
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    # Walk the cumulative counts until the nearest rank is reached
+    rank = max(1, math.ceil(p / 100 * total))
+    running = 0
+    for grade, count in enumerate(counts):
+        running += count
+        if running >= rank:
+            return grade
+
+
+def _round_average(average):
+    """Round an average to the nearest whole grade, halves rounding up (e.g. 82.5 -> 83)"""
+    return int(average + 0.5)
+
+
+def display_class_summary(gradebook):
+    """
+    Print the Section A class summary from the gradebook's maintained counters
+
+    Args:
+        gradebook (Gradebook): Gradebook to summarise
+    """
+    summary = gradebook.class_summary()
+
+    print("\n--- Class Summary ---")
+    print(f"Total Students: {summary['students']}")
+    if not summary["graded"]:
+        print("No grades recorded.")
+        return
+    print(f"Passed: {summary['passed']}, Failed: {summary['failed']}")
+    print(f"Class Average: {summary['average']:.2f}")
+    print("Results: " + ", ".join(f"{band}: {count}" for band, count in summary["results"].items()))
+    print("Grades: " + ", ".join(f"{letter}: {count}"
+                                 for letter, count in summary["letter_grades"].items()))
+
+
+def display_histogram(gradebook, subject):
+    """
+    Print a text histogram of a subject's grades in bands of 10, plus quartiles
+
+    Args:
+        gradebook (Gradebook): Gradebook to report on
+        subject (str): Subject name, or AVERAGE_KEY for rounded student averages
+
+    Raises:
+        ValueError: If subject is not in available subjects list
+    """
+    counts = gradebook.histogram(subject)
+    total = sum(counts)
+
+    print(f"\n--- {subject} Grade Distribution ---")
+    if total == 0:
+        print("No grades recorded.")
+        return
+
+    # Group the 101 exact counts into bands of 10 (90-100 includes 100)
+    bands = [(low, min(low + 9, 100) if low < 90 else 100) for low in range(0, 100, 10)]
+    band_counts = [sum(counts[low:high + 1]) for low, high in bands]
+    widest = max(band_counts)
+    for (low, high), count in zip(bands, band_counts):
+        bar = "#" * round(40 * count / widest) if widest else ""
+        print(f"{low:>3}-{high:<3} | {bar} {count}")
+
+    mean, std, _ = _mean_and_std(counts)
+    print(f"Students: {total}")
+    print(f"Mean: {mean:.2f}, Standard deviation: {std:.2f}")
+    print(f"Lower quartile: {gradebook.percentile(subject, 25)}, "
+          f"Median: {gradebook.percentile(subject, 50)}, "
+          f"Upper quartile: {gradebook.percentile(subject, 75)}")
+
+
+def _npz_path(path):
+    """Return path with the .npz suffix that np.savez gives every archive"""
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def _memmap_npz_member(path, name):
+    """
+    Memory-map one array stored inside an uncompressed .npz archive
+
+    Args:
+        path (str): Path to the .npz file
+        name (str): Array name (without the .npy suffix)
+
+    Returns:
+        numpy.memmap: Read-only view of the array, or None if the member is
+                      compressed and therefore cannot be mapped
+    """
+    import numpy as np  # Optional dependency - only needed for .npz files
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(path, "rb") as file:
+        # Skip the zip local file header to reach the .npy payload
+        file.seek(info.header_offset)
+        local_header = file.read(30)
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+
+        # Parse the .npy header to find dtype, shape and data offset
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        offset = file.tell()
+
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape,
+                     order="F" if fortran_order else "C", offset=offset)
+
+
+def _counting_sort(students, bucket_key, num_buckets, descending):
+    """
+    Stable counting (bucket) sort for keys that are small non-negative integers
+
+    Args:
+        students (list): Student objects to sort
+        bucket_key (callable): Returns an int in range(num_buckets) for a student
+        num_buckets (int): Size of the key domain
+        descending (bool): True for highest key first
+
+    Returns:
+        list: New sorted list, or None if any key is outside the domain
+    """
+    buckets = [[] for _ in range(num_buckets)]
+    for student in students:
+        key = bucket_key(student)
+        if type(key) is not int or not 0 <= key < num_buckets:
+            return None
+        buckets[key].append(student)
+
+    # Concatenate buckets in key order - each bucket keeps input order (stable)
+    ordered = reversed(buckets) if descending else buckets
+    sorted_students = []
+    for bucket in ordered:
+        sorted_students.extend(bucket)
+    return sorted_students
+
+
+def benchmark_sort_paths(num_students=1_000_000, bubble_students=2_000):
+    """
+    Time the counting-sort fast paths against the comparison sorts they replace
+
+    Bubble sort is O(n^2), so it is timed on a smaller roster (bubble_students)
+
+    Args:
+        num_students (int): Roster size for the counting sort vs sorted() timings
+        bubble_students (int): Roster size for the bubble sort timing
+    """
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        print(f"  {label:<45} {time.perf_counter() - start:8.3f} s")
+
+    def build_gradebook(size):
+        gradebook = Gradebook()
+        for i in range(size):
+            student = Student(f"Student{i}", "Benchmark")
+            for subject in gradebook.subjects:
+                student.grades[subject] = random.randint(0, 100)
+            gradebook.students.append(student)
+        return gradebook
+
+    print(f"\n--- Sort Benchmarks ({num_students:,} students) ---")
+    gradebook = build_gradebook(num_students)
+    timed("sorted() by Math grade", lambda: sorted(
+        gradebook.students, key=lambda student: student.grades.get("Math", 0), reverse=True))
+    timed("counting sort by Math grade", lambda: gradebook._sort_by_subject("Math"))
+    timed("sorted() by average", lambda: sorted(
+        gradebook.students, key=Student.get_average, reverse=True))
+    timed("counting sort by average", lambda: gradebook._counting_sort_by_average(True))
+
+    print(f"\n--- Sort Benchmarks ({bubble_students:,} students) ---")
+    gradebook = build_gradebook(bubble_students)
+    timed("bubble sort by average", lambda: gradebook._bubble_sort_by_average(True))
+    timed("counting sort by average", lambda: gradebook._counting_sort_by_average(True))
+
+
+def _write_sorted_run(records, descending):
+    """
+    Sort one in-memory batch of records and spill it to a temporary file
+
+    Args:
+        records (list): Compact (key, first_name, surname, grades) tuples
+        descending (bool): True for highest key first
+
+    Returns:
+        file: Temporary file positioned at the start of the sorted run
+    """
+    # Stable sort of this batch only - the merge step combines the runs
+    records.sort(key=itemgetter(0), reverse=descending)
+
+    run_file = tempfile.TemporaryFile()
+    for record in records:
+        pickle.dump(record, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+    run_file.seek(0)
+    return run_file
+
+
+def _read_sorted_run(run_file):
+    """
+    Stream records back from a sorted run file, closing it when exhausted
+
+    Args:
+        run_file (file): Temporary file created by _write_sorted_run
+
+    Yields:
+        tuple: Compact (key, first_name, surname, grades) records in run order
+    """
+    try:
+        while True:
+            try:
+                yield pickle.load(run_file)
+            except EOFError:
+                return
+    finally:
+        run_file.close()
+
+
+def external_sort_students(source, key=None, descending=True, run_size=100_000):
+    """
+    Rank students from any iterable without holding them all in memory
+    Uses an external merge sort: sorted runs are spilled to temporary files
+    as compact records and then k-way merged with heapq.merge
+
+    Args:
+        source (iterable): Any iterable of Student objects (list, generator, reader)
+        key (callable): Function returning the sort key for a Student
+                        (defaults to Student.get_average)
+        descending (bool): True for highest first, False for lowest first
+        run_size (int): Number of records held in memory per sorted run
+
+    Returns:
+        generator: Students in sorted order, rebuilt from their compact records
+
+    Raises:
+        ValueError: If run_size is not a positive number
+    """
+    # Validate run size here, not in the generator, so the caller sees the error at once
+    if run_size <= 0:
+        raise ValueError("run_size must be a positive number")
+
+    if key is None:
+        key = Student.get_average
+    return _external_sort(source, key, descending, run_size)
+
+
+def _external_sort(source, key, descending, run_size):
+    """Generator behind external_sort_students (arguments already validated)"""
+    runs = []
+    batch = []
+
+    try:
+        # Phase 1: build sorted runs of compact records with a fixed memory budget
+        for student in source:
+            batch.append((key(student), student.first_name, student.surname,
+                          tuple(student.grades.items())))
+            if len(batch) >= run_size:
+                runs.append(_write_sorted_run(batch, descending))
+                batch = []
+        if batch:
+            runs.append(_write_sorted_run(batch, descending))
+            batch = []
+
+        # Phase 2: k-way merge of all runs (stable - ties keep input order)
+        merged = heapq.merge(*(_read_sorted_run(run) for run in runs),
+                             key=itemgetter(0), reverse=descending)
+        for _, first_name, surname, grades in merged:
+            student = Student(first_name, surname)
+            student.grades = dict(grades)
+            yield student
+
+    finally:
+        # Remove any runs left behind if the caller stopped early
+        for run in runs:
+            run.close()
+
+
+def _shard_worker(connection, subjects):
+    """
+    Worker process loop that owns one shard Gradebook
+
+    Receives (command, args) tuples and answers with (ok, result) tuples,
+    where result is the exception instance when ok is False
+
+    Args:
+        connection (Connection): Pipe end shared with the ShardedGradebook
+        subjects (list): Subjects tracked by the gradebook
+    """
+    gradebook = Gradebook()
+    gradebook.subjects = list(subjects)
+
+    while True:
+        command, args = connection.recv()
+        if command == "stop":
+            connection.close()
+            return
+
+        try:
+            if command == "add":
+                result = gradebook._attach_student(args[0])
+            elif command == "remove":
+                result = gradebook._pop_student(args[0])
+            elif command == "set_grade":
+                full_name, subject, grade = args
+                student = gradebook.search_student(full_name)
+                if student is None:
+                    raise StudentNotFoundError(f"Student '{full_name}' not found")
+                result = student.add_grade(subject, grade)
+            else:
+                result = getattr(gradebook, command)(*args)
+                if isinstance(result, types.GeneratorType):
+                    result = list(result)
+            connection.send((True, result))
+        except Exception as e:
+            connection.send((False, e))
+
+
+class ShardedGradebook:
+    """
+    Gradebook partitioned across several worker processes
+    Single-student operations are routed to one shard; roster-wide searches,
+    sorts and statistics fan out to every shard in parallel and are merged here.
+    Offers the same methods as Gradebook, so the menu code works with either.
+
+    Students returned by this class are copies of the shard's records; calling
+    add_grade on them forwards the change to the owning shard.
+    """
 
-    def get_average(self):
+    def __init__(self, num_shards=4, shard_key=None):
         """
-        Calculate and return the average grade across all subjects
+        Start one worker process per shard
 
-        Returns:
-            float: Average grade, or 0 if no grades available
+        Args:
+            num_shards (int): Number of shards / worker processes
+            shard_key (callable): Returns the partition key for a Student, e.g. its
+                                  class; defaults to the casefolded full name
+
+        Raises:
+            ValueError: If num_shards is not a positive number
         """
-        if not self.grades:
-            return 0
-        return sum(self.grades.values()) / len(self.grades)
+        # Validate shard count
+        if num_shards <= 0:
+            raise ValueError("Number of shards must be a positive number")
 
-    def display_info(self):
-        """Display student's complete information and grades in formatted output"""
-        print(f"\n{self.full_name}")
-        for subject, grade in self.grades.items():
-            print(f"  {subject}: {grade}")
-        print(f"  Average: {self.get_average():.2f}")
+        self.subjects = ["Math", "English", "Science"]  # Available subjects
+        self.shard_key = shard_key
+        self.gpa_engine = GPAEngine()  # Mirrors the shards' engine for merging results
+        self._connections = []
+        self._workers = []
+        for _ in range(num_shards):
+            parent_end, child_end = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_shard_worker,
+                                             args=(child_end, self.subjects), daemon=True)
+            worker.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop all worker processes"""
+        for connection, worker in zip(self._connections, self._workers):
+            if worker.is_alive():
+                connection.send(("stop", ()))
+                worker.join()
+            connection.close()
+        self._connections = []
+        self._workers = []
+
+    # ---------------- Routing helpers ----------------
+    def _shard_for_name(self, full_name):
+        """Return the shard index that owns a name, or None if names do not decide placement"""
+        if self.shard_key is not None:
+            return None
+        # crc32 is stable across processes, unlike the built-in hash()
+        return zlib.crc32(full_name.strip().casefold().encode("utf-8")) % len(self._connections)
+
+    def _shard_for_student(self, student):
+        """Return the shard index a student is stored on"""
+        if self.shard_key is None:
+            return self._shard_for_name(student.full_name)
+        key = repr(self.shard_key(student)).encode("utf-8")
+        return zlib.crc32(key) % len(self._connections)
+
+    def _receive(self, connection):
+        """Wait for one shard reply, re-raising any exception from the worker"""
+        ok, result = connection.recv()
+        if not ok:
+            raise result
+        return self._adopt(result)
+
+    def _adopt(self, result):
+        """Point returned Student copies back at this gradebook so add_grade is forwarded"""
+        if isinstance(result, Student):
+            result.gradebook = self
+        elif isinstance(result, (list, tuple)):
+            for item in result:
+                self._adopt(item)
+        return result
+
+    def _call(self, shard, command, *args):
+        """Run a command on one shard and return its result"""
+        connection = self._connections[shard]
+        connection.send((command, args))
+        return self._receive(connection)
+
+    def _call_all(self, command, *args):
+        """Run a command on every shard in parallel and return the list of results"""
+        for connection in self._connections:
+            connection.send((command, args))
+        # Read every reply before raising, so no answer is left behind in a pipe
+        replies = [connection.recv() for connection in self._connections]
+        for ok, result in replies:
+            if not ok:
+                raise result
+        return [self._adopt(result) for _, result in replies]
+
+    def _call_until_found(self, command, *args):
+        """Fan out a lookup to every shard and return the first non-None answer"""
+        for result in self._call_all(command, *args):
+            if result is not None:
+                return result
+        return None
 
+    def _grade_changed(self, student, subject, old_grade):
+        """Forward add_grade on a returned Student copy to the shard that owns it"""
+        self._call(self._shard_for_student(student), "set_grade",
+                   student.full_name, subject, student.grades[subject])
 
-class Gradebook:
-    """
-    Manages a collection of Student objects with comprehensive operations
-    Includes searching, sorting, and data management functionalities
-    """
+    def _name_changed(self, student, old_full_name):
+        """
+        Forward a rename on a returned Student copy: the old record is removed and
+        the renamed copy is added to the shard its new name (or key) belongs to
+        """
+        self._pop_student(old_full_name)
+        self._call(self._shard_for_student(student), "add", student)
 
-    def __init__(self):
-        """Initialize an empty gradebook with predefined subjects"""
-        self.students = []  # List to store Student objects
-        self.subjects = ["Math", "English", "Science"]  # Available subjects
+    # ---------------- Gradebook API ----------------
+    def __len__(self):
+        """Total number of students across all shards"""
+        return sum(self._call_all("__len__"))
+
+    @property
+    def students(self):
+        """All students from every shard (shard by shard)"""
+        return [student for shard in self._call_all("iter_students") for student in shard]
 
     def add_student(self, student):
         """
-        Add a student to the gradebook with type validation
-
-        Args:
-            student (Student): Student object to add
+        Add a student to the shard chosen by the shard key
 
         Raises:
             TypeError: If parameter is not a Student object
@@ -198,19 +4196,13 @@ class Gradebook:
         if not isinstance(student, Student):
             raise TypeError("Can only add Student objects to gradebook")
 
-        # Add student to collection
-        self.students.append(student)
+        self._call(self._shard_for_student(student), "add", student)
+        student.gradebook = self
         print(f"Student {student.full_name} added successfully!")
 
     def remove_student(self, full_name):
         """
-        Remove a student by full name using linear search algorithm
-
-        Args:
-            full_name (str): Full name of student to remove
-
-        Returns:
-            bool: True if student found and removed, False otherwise
+        Remove a student by full name from whichever shard holds them
 
         Raises:
             EmptyNameError: If full_name is empty or whitespace
@@ -220,143 +4212,327 @@ class Gradebook:
         if not full_name.strip():
             raise EmptyNameError("Student name cannot be empty")
 
-        # Linear search through students list
-        for i, student in enumerate(self.students):
-            if student.full_name.lower() == full_name.lower().strip():
-                removed_student = self.students.pop(i)
-                print(f"Student {removed_student.full_name} removed successfully!")
-                return True
+        removed_student = self._pop_student(full_name)
+        print(f"Student {removed_student.full_name} removed successfully!")
+        return True
 
-        # Student not found - raise custom exception
-        raise StudentNotFoundError(f"Student '{full_name}' not found")
+    def _pop_student(self, full_name):
+        """
+        Remove a student by full name from whichever shard holds them, without printing
+
+        Returns:
+            Student: Copy of the removed student
+
+        Raises:
+            StudentNotFoundError: If student not found in system
+        """
+        shard = self._shard_for_name(full_name)
+        if shard is not None:
+            removed_student = self._call(shard, "remove", full_name)
+        else:
+            # Placement is not by name - ask every shard, one will own the student
+            removed_student = None
+            for connection in self._connections:
+                connection.send(("remove", (full_name,)))
+            for connection in self._connections:
+                try:
+                    removed_student = self._receive(connection)
+                except StudentNotFoundError:
+                    pass
+            if removed_student is None:
+                raise StudentNotFoundError(f"Student '{full_name}' not found")
+        return removed_student
 
     def search_student(self, full_name):
         """
-        Search for a student by name using linear search algorithm
+        Search for a student by name on the owning shard (or all shards)
 
-        Args:
-            full_name (str): Full name of student to find
+        Raises:
+            EmptyNameError: If full_name is empty or whitespace
+        """
+        # Validate input
+        if not full_name.strip():
+            raise EmptyNameError("Student name cannot be empty")
 
-        Returns:
-            Student: Found student object, or None if not found
+        shard = self._shard_for_name(full_name)
+        if shard is not None:
+            return self._call(shard, "search_student", full_name)
+        return self._call_until_found("search_student", full_name)
+
+    def grade_history(self, full_name):
+        """
+        Audit trail of grade changes for one student, read from the owning shard
 
         Raises:
             EmptyNameError: If full_name is empty or whitespace
+            StudentNotFoundError: If student not found in system
         """
         # Validate input
         if not full_name.strip():
             raise EmptyNameError("Student name cannot be empty")
 
-        # Linear search implementation
-        for student in self.students:
-            if student.full_name.lower() == full_name.lower().strip():
-                return student
-        return None
-
-    def display_all_students(self):
-        """Display all students in the gradebook with their complete information"""
-        # Handle empty gradebook case
-        if not self.students:
-            print("No students in the system.")
-            return
+        shard = self._shard_for_name(full_name)
+        if shard is not None:
+            return self._call(shard, "grade_history", full_name)
 
-        # Display header and all student records
-        print("\n--- All Student Records ---")
+        # Placement is not by name - ask every shard, one will own the student
+        changes = None
+        for connection in self._connections:
+            connection.send(("grade_history", (full_name,)))
+        for connection in self._connections:
+            try:
+                changes = self._receive(connection)
+            except StudentNotFoundError:
+                pass
+        if changes is None:
+            raise StudentNotFoundError(f"Student '{full_name}' not found")
+        return changes
+
+    def iter_students(self, filter=None, key=None):
+        """Iterate over all students, optionally filtered and projected (filtering runs here)"""
         for student in self.students:
-            student.display_info()
+            if filter is None or filter(student):
+                yield student if key is None else key(student)
 
-    def display_subject_grades(self, subject):
+    def query(self, text):
         """
-        Display all students' grades for a specific subject
+        Query run on every shard's columns in parallel (shard by shard)
 
-        Args:
-            subject (str): Subject to display grades for
+        Raises:
+            InvalidQueryError: If the query cannot be parsed, names an unknown field
+                               or uses normalized
+        """
+        if "normalized" in GradebookQuery(text).fields():
+            # Each shard would normalize against its own subset of the roster
+            raise InvalidQueryError("normalized needs the whole roster and is not "
+                                    "available on a sharded gradebook")
+        return [student for shard in self._call_all("query", text) for student in shard]
+
+    def export(self, path, format="csv", compress=True, chunk_size=10_000):
+        """
+        Stream every shard's students to a CSV or JSON Lines file (see Gradebook.export)
 
         Raises:
-            ValueError: If subject is not in available subjects list
+            ValueError: If format is not supported or chunk_size is not positive
         """
-        # Validate subject input
-        if subject not in self.subjects:
-            raise ValueError(f"Invalid subject. Available subjects: {', '.join(self.subjects)}")
+        # Gradebook.export only needs subjects and iter_students, which this class offers
+        return Gradebook.export(self, path, format, compress, chunk_size)
 
-        # Display subject grades header
-        print(f"\n--- {subject} Grades ---")
+    def search_partial_name(self, partial_name):
+        """Partial name search run on all shards in parallel"""
+        return [student for shard in self._call_all("search_partial_name", partial_name)
+                for student in shard]
 
-        # Handle empty gradebook case
-        if not self.students:
-            print("No students in the system.")
-            return
+    def search_by_min_average(self, threshold, key="average"):
+        """Threshold search (by any ranking key) run on all shards in parallel"""
+        return [student for shard in self._call_all("search_by_min_average", threshold, key)
+                for student in shard]
 
-        # Display grades for each student
-        for student in self.students:
-            grade = student.grades.get(subject, "No grade")
-            print(f"{student.full_name}: {grade}")
+    def set_gpa_engine(self, engine):
+        """
+        Replace the GPA engine on every shard
 
-    def bubble_sort_students_by_average(self, descending=True):
+        Raises:
+            TypeError: If parameter is not a GPAEngine object
         """
-        Sort students by average grade using bubble sort algorithm
+        if not isinstance(engine, GPAEngine):
+            raise TypeError("GPA engine must be a GPAEngine object")
+        self._call_all("set_gpa_engine", engine)
+        self.gpa_engine = engine
+
+    def score_function(self, key="average"):
+        """
+        Scoring function used to merge shard results for a ranking key
+
+        Raises:
+            ValueError: If key is not one of SCORE_KEYS
+        """
+        if key == "average":
+            return Student.get_average
+        if key == "weighted":
+            return lambda student: self.gpa_engine._compute(student)[0]
+        if key == "gpa":
+            return lambda student: self.gpa_engine._compute(student)[1]
+        if key == "normalized":
+            # Each shard would normalize against its own subset of the roster
+            raise ValueError("Normalized ranking needs the whole roster and is not "
+                             "available on a sharded gradebook")
+        raise ValueError(f"Invalid ranking key. Available keys: {', '.join(SCORE_KEYS)}")
+
+    def fuzzy_search(self, full_name, max_distance=2):
+        """Fuzzy name search run on all shards in parallel, merged by distance"""
+        return list(heapq.merge(*self._call_all("fuzzy_search", full_name, max_distance),
+                                key=itemgetter(0)))
+
+    def top_students(self, k, descending=True):
+        """Top-k by average: each shard picks its own top k, then the candidates are merged"""
+        candidates = [student for shard in self._call_all("top_students", k, descending)
+                      for student in shard]
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(k, candidates, key=Student.get_average)
+
+    def class_summary(self):
+        """Class summary merged from every shard's maintained counters"""
+        summaries = self._call_all("class_summary")
+        graded = sum(summary["graded"] for summary in summaries)
+        return {
+            "students": sum(summary["students"] for summary in summaries),
+            "graded": graded,
+            "passed": sum(summary["passed"] for summary in summaries),
+            "failed": sum(summary["failed"] for summary in summaries),
+            "average": sum(summary["average"] * summary["graded"] for summary in summaries) / graded
+                       if graded else 0.0,
+            "results": {band: sum(summary["results"][band] for summary in summaries)
+                        for band in RESULT_BANDS},
+            "letter_grades": {letter: sum(summary["letter_grades"][letter] for summary in summaries)
+                              for letter in LETTER_GRADES},
+        }
+
+    def memory_report(self, include_peaks=True):
+        """
+        Memory report summed across the shards' worker processes (see Gradebook.memory_report)
+
+        Component sizes and peaks are added up, as every shard holds its own
+        structures and runs the measured operations at the same time
+        """
+        reports = self._call_all("memory_report", include_peaks)
+        students = sum(report["students"] for report in reports)
+        total = sum(report["total_bytes"] for report in reports)
+
+        report = {
+            "students": students,
+            "components": {name: sum(shard["components"][name] for shard in reports)
+                           for name in reports[0]["components"]},
+            "total_bytes": total,
+            "bytes_per_student": total / students if students else 0,
+        }
+        if include_peaks:
+            report["peaks"] = {name: sum(shard["peaks"][name] for shard in reports)
+                               for name in reports[0]["peaks"]}
+        if all("traced_bytes" in shard for shard in reports):
+            report["traced_bytes"] = sum(shard["traced_bytes"] for shard in reports)
+        return report
+
+    def group_by(self, key):
+        """
+        Start a group-by whose partial states are computed on every shard in parallel
 
         Args:
-            descending (bool): True for highest first, False for lowest first
+            key (callable or str): Grouping as for Gradebook.group_by; a callable
+                                   cannot be sent to the workers and is applied here
 
         Returns:
-            list: Sorted list of Student objects
-
-        TESTING NOTE: Bubble sort verified with various student lists
+            GroupBy: Call .aggregate(...) on it to compute the breakdown
         """
-        # Create copy to avoid modifying original list
-        students_copy = self.students.copy()
-        n = len(students_copy)
+        if callable(key):
+            return GroupBy(self.students, key)
+        return _ShardedGroupBy(self, key)
 
-        # Bubble sort implementation
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                # Compare adjacent elements based on sort order
-                if descending:
-                    if students_copy[j].get_average() < students_copy[j + 1].get_average():
-                        # Swap elements
-                        students_copy[j], students_copy[j + 1] = students_copy[j + 1], students_copy[j]
-                else:
-                    if students_copy[j].get_average() > students_copy[j + 1].get_average():
-                        # Swap elements
-                        students_copy[j], students_copy[j + 1] = students_copy[j + 1], students_copy[j]
+    def band_query(self, text):
+        """Band query run on every shard's bitmaps in parallel (shard by shard)"""
+        return [student for shard in self._call_all("band_query", text) for student in shard]
 
-        return students_copy
+    def band_count(self, text):
+        """Band query match count summed across all shards"""
+        return sum(self._call_all("band_count", text))
 
-    def insertion_sort_students_by_name(self):
-        """
-        Sort students by name using insertion sort algorithm
+    def histogram(self, subject):
+        """Exact grade distribution summed across all shards"""
+        return [sum(counts) for counts in zip(*self._call_all("histogram", subject))]
 
-        Returns:
-            list: Alphabetically sorted list of Student objects
+    def percentile(self, subject, p):
+        """
+        Exact nearest-rank percentile from the merged shard histograms
 
-        TESTING NOTE: Insertion sort verified with various name combinations
+        Raises:
+            ValueError: If subject is unknown or p is outside 0-100
         """
-        # Create copy to avoid modifying original list
-        students_copy = self.students.copy()
+        # Validate percentile range
+        if p < 0 or p > 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        return _percentile_from_counts(self.histogram(subject), p)
 
-        # Insertion sort implementation
-        for i in range(1, len(students_copy)):
-            key = students_copy[i]
-            j = i - 1
+    def _merge_sorted(self, command, args, key, reverse):
+        """Sort on every shard in parallel, then k-way merge the sorted shard lists"""
+        return list(heapq.merge(*self._call_all(command, *args), key=key, reverse=reverse))
 
-            # Move elements that are greater than key to one position ahead
-            while j >= 0 and students_copy[j].full_name.lower() > key.full_name.lower():
-                students_copy[j + 1] = students_copy[j]
-                j -= 1
-            students_copy[j + 1] = key
+    def bubble_sort_students_by_average(self, descending=True, key="average"):
+        """All students sorted by a ranking key (shards sort in parallel, results are merged)"""
+        return self._merge_sorted("bubble_sort_students_by_average", (descending, key),
+                                  self.score_function(key), descending)
 
-        return students_copy
+    def insertion_sort_students_by_name(self):
+        """All students sorted A-Z by name (each shard's name index, merged)"""
+        return self._merge_sorted("insertion_sort_students_by_name", (),
+                                  lambda student: student.full_name.casefold(), False)
+
+    def names_with_prefix(self, prefix):
+        """Prefix name search run on all shards in parallel, merged A-Z"""
+        return self._merge_sorted("names_with_prefix", (prefix,),
+                                  lambda student: student.full_name.casefold(), False)
+
+    def names_between(self, first, last):
+        """Alphabetical name range run on all shards in parallel, merged A-Z"""
+        return self._merge_sorted("names_between", (first, last),
+                                  lambda student: student.full_name.casefold(), False)
 
     def sort_students_by_subject(self, subject):
         """
-        Sort students by grade in a specific subject using built-in sorted
+        All students sorted by one subject's grade, highest first
 
-        Args:
-            subject (str): Subject to sort by
+        Raises:
+            ValueError: If subject is not in available subjects list
+        """
+        return self._merge_sorted("sort_students_by_subject", (subject,),
+                                  lambda student: student.grades.get(subject, 0), True)
 
-        Returns:
-            list: Students sorted by subject grade (highest first)
+    def page(self, view="all", cursor=0, size=20):
+        """
+        One page of a listing or sorted view, merged from the shards' first pages
+
+        Raises:
+            ValueError: If the view is unknown, size is not positive or cursor is negative
+        """
+        # Validate paging parameters
+        if size <= 0:
+            raise ValueError("Page size must be a positive number")
+        if cursor < 0:
+            raise ValueError("Cursor cannot be negative")
+
+        # Each shard only needs to contribute its first cursor + size students
+        shard_pages = [students for students, _, _ in self._call_all("page", view, 0, cursor + size)]
+        if view == "all":
+            merged = [student for students in shard_pages for student in students]
+        elif view in SCORE_KEYS:
+            merged = heapq.merge(*shard_pages, key=self.score_function(view), reverse=True)
+        elif view.endswith("_asc"):
+            merged = heapq.merge(*shard_pages, key=self.score_function(view[:-len("_asc")]))
+        elif view == "name":
+            merged = heapq.merge(*shard_pages, key=lambda student: student.full_name.casefold())
+        else:
+            merged = heapq.merge(*shard_pages, key=lambda student: student.grades.get(view, 0),
+                                 reverse=True)
+
+        page_students = list(merged)[cursor:cursor + size]
+        total = len(self)
+        next_cursor = cursor + size if cursor + size < total else None
+        previous_cursor = max(cursor - size, 0) if cursor > 0 else None
+        return page_students, next_cursor, previous_cursor
+
+    def display_all_students(self):
+        """Display all students from every shard"""
+        students = self.students
+        if not students:
+            print("No students in the system.")
+            return
+
+        print("\n--- All Student Records ---")
+        for student in students:
+            student.display_info()
+
+    def display_subject_grades(self, subject):
+        """
+        Display all students' grades for a specific subject
 
         Raises:
             ValueError: If subject is not in available subjects list
@@ -365,10 +4541,13 @@ class Gradebook:
         if subject not in self.subjects:
             raise ValueError(f"Invalid subject. Available subjects: {', '.join(self.subjects)}")
 
-        # Sort using Python's built-in sorted with custom key
-        return sorted(self.students,
-                      key=lambda student: student.grades.get(subject, 0),
-                      reverse=True)
+        print(f"\n--- {subject} Grades ---")
+        students = self.students
+        if not students:
+            print("No students in the system.")
+            return
+        for student in students:
+            print(f"{student.full_name}: {student.grades.get(subject, 'No grade')}")
 
 
 def add_student(gradebook):
@@ -444,6 +4623,43 @@ def add_student(gradebook):
         print(f"Error adding students: {e}")
 
 
+def import_students(gradebook):
+    """
+    Add or update students in bulk from a CSV file (name column plus one column
+    per subject, as written by the export option) and print a validation report
+    """
+    if not isinstance(gradebook, Gradebook):
+        print("Bulk import is only available on a single gradebook.")
+        return
+
+    path = input("Enter CSV file path to import: ").strip()
+    mode = input("Import mode (1: Add new students, 2: Update existing grades): ").strip()
+    try:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if not header or header[0] != "name":
+                raise ValueError("The first column must be 'name'")
+
+            # Computed export columns are not grades
+            columns = [column for column in header[1:] if column not in ("average", "letter_grade")]
+            records = []
+            for values in reader:
+                grades = {}
+                for column, value in zip(columns, values[1:]):
+                    value = value.strip()
+                    if value:
+                        grades[column] = int(value) if value.lstrip("-").isdigit() else value
+                records.append((values[0] if values else "", grades))
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+        return
+
+    report = gradebook.bulk_update(records) if mode == "2" else gradebook.bulk_add(records)
+    print(report.format())
+    print(f"{'Updated' if mode == '2' else 'Added'} {len(report.valid)} student(s).")
+
+
 def search_student_advanced(gradebook):
     """
     Advanced search functionality with multiple search options
@@ -457,8 +4673,13 @@ def search_student_advanced(gradebook):
         print("1. Search by exact name")
         print("2. Search by partial name")
         print("3. Search students with average above threshold")
+        print("4. Fuzzy name search (tolerates typos)")
+        print("5. Query (e.g. Math >= 70 and avg between 60 and 80 and name ~ \"smi\")")
+        print("6. Names starting with")
+        print("7. Names in an alphabetical range (e.g. A to F)")
+        print("8. Grade band query (e.g. Math is Fail and Science is Passed)")
 
-        choice = input("Choose search option (1-3): ").strip()
+        choice = input("Choose search option (1-8): ").strip()
 
         if choice == "1":
             # Exact name search
@@ -472,57 +4693,254 @@ def search_student_advanced(gradebook):
         elif choice == "2":
             # Partial name search (contains matching)
             partial_name = input("Enter partial name to search: ").strip().lower()
-            found_students = []
 
-            # Linear search through all students
-            for student in gradebook.students:
-                if partial_name in student.full_name.lower():
-                    found_students.append(student)
+            # Stream matches as they are found
+            found_count = 0
+            for student in gradebook.search_partial_name(partial_name):
+                student.display_info()
+                found_count += 1
 
             # Display results
-            if found_students:
-                print(f"\nFound {len(found_students)} student(s):")
-                for student in found_students:
-                    student.display_info()
+            if found_count:
+                print(f"\nFound {found_count} student(s).")
             else:
                 print("No students found matching the search criteria.")
 
         elif choice == "3":
             # Threshold-based search
             try:
-                threshold = float(input("Enter minimum average grade (0-100): "))
-
-                # Validate threshold range
-                if threshold < 0 or threshold > 100:
-                    raise InvalidGradeError("Threshold must be between 0 and 100")
-
-                found_students = []
-
-                # Find students meeting threshold criteria
-                for student in gradebook.students:
-                    if student.get_average() >= threshold:
-                        found_students.append(student)
+                key = choose_score_key()
+                if key == "normalized":
+                    # Z-scores: 0 is the subject mean, negative is below it
+                    threshold = float(input(f"Enter minimum {SCORE_LABELS[key]} (e.g. -1 to 2): "))
+                else:
+                    # GPA runs up to the engine's top grade points, averages up to 100
+                    maximum = max(gradebook.gpa_engine.points_by_mark) if key == "gpa" else 100
+                    threshold = float(input(f"Enter minimum {SCORE_LABELS[key]} (0-{maximum:g}): "))
+
+                    # Validate threshold range
+                    if threshold < 0 or threshold > maximum:
+                        raise InvalidGradeError(f"Threshold must be between 0 and {maximum:g}")
+                score = gradebook.score_function(key)
+
+                # Stream students meeting threshold criteria as they are found
+                print(f"\nStudents with {SCORE_LABELS[key]} ≥ {threshold}:")
+                found_count = 0
+                for student in gradebook.search_by_min_average(threshold, key):
+                    print(f"{student.full_name}: {score(student):.2f}")
+                    found_count += 1
 
                 # Display threshold search results
-                if found_students:
-                    print(f"\nFound {len(found_students)} student(s) with average ≥ {threshold}:")
-                    for student in found_students:
-                        print(f"{student.full_name}: {student.get_average():.2f}")
+                if found_count:
+                    print(f"Found {found_count} student(s) with {SCORE_LABELS[key]} ≥ {threshold}")
                 else:
-                    print(f"No students found with average ≥ {threshold}")
+                    print(f"No students found with {SCORE_LABELS[key]} ≥ {threshold}")
 
             except ValueError:
                 print("Invalid input. Please enter a number.")
 
+        elif choice == "4":
+            # Fuzzy name search backed by the BK-tree index
+            name = input("Enter student name (typos allowed): ").strip()
+            try:
+                max_distance = int(input("Maximum number of typos (default 2): ").strip() or 2)
+                matches = gradebook.fuzzy_search(name, max_distance)
+
+                # Display closest matches first
+                if matches:
+                    print(f"\nFound {len(matches)} close match(es):")
+                    for distance, student in matches:
+                        print(f"{student.full_name} ({distance} edit(s) away)")
+                else:
+                    print("No students found with a similar name.")
+
+            except ValueError as e:
+                print(f"Invalid input: {e}")
+
+        elif choice == "5":
+            # Compiled query over the whole roster
+            text = input("Enter query: ").strip()
+            matches = gradebook.query(text)
+            if matches:
+                print(f"\nFound {len(matches)} student(s):")
+                for student in matches:
+                    print(student_summary_line(student))
+            else:
+                print("No students found matching the query.")
+
+        elif choice == "6":
+            # Prefix lookup in the ordered name index
+            prefix = input("Enter the start of the name: ").strip()
+            if not prefix:
+                raise EmptyNameError("Prefix cannot be empty")
+            matches = gradebook.names_with_prefix(prefix)
+            if matches:
+                print(f"\nFound {len(matches)} student(s) starting with '{prefix}':")
+                for student in matches:
+                    print(student_summary_line(student))
+            else:
+                print(f"No students found starting with '{prefix}'.")
+
+        elif choice == "7":
+            # Range scan over the ordered name index
+            first = input("From (e.g. A): ").strip()
+            last = input("To (e.g. F): ").strip()
+            if not first or not last:
+                raise EmptyNameError("Both ends of the range are required")
+            matches = gradebook.names_between(first, last)
+            if matches:
+                print(f"\nFound {len(matches)} student(s) from '{first}' to '{last}':")
+                for student in matches:
+                    print(student_summary_line(student))
+            else:
+                print(f"No students found from '{first}' to '{last}'.")
+
+        elif choice == "8":
+            # AND / OR / NOT over the per-subject grade band bitmaps
+            text = input("Enter band query: ").strip()
+            matches = gradebook.band_query(text)
+            if matches:
+                print(f"\nFound {len(matches)} student(s):")
+                for student in matches:
+                    print(student_summary_line(student))
+            else:
+                print("No students found matching the band query.")
+
         else:
             print("Invalid choice.")
 
-    except (StudentNotFoundError, EmptyNameError, InvalidGradeError) as e:
+    except (StudentNotFoundError, EmptyNameError, InvalidGradeError, InvalidQueryError) as e:
         print(f"Search error: {e}")
     except Exception as e:
         print(f"Unexpected search error: {e}")
 
 
+# Menu labels for the ranking keys in SCORE_KEYS
+SCORE_LABELS = {"average": "Average", "weighted": "Weighted Average", "gpa": "GPA",
+                "normalized": "Normalized Average"}
+
+
+def choose_score_key():
+    """
+    Ask which ranking key to use (average, weighted average or GPA)
+
+    Returns:
+        str: One of SCORE_KEYS (defaults to "average")
+    """
+    print("Rank by: " + ", ".join(f"{number}: {SCORE_LABELS[key]}"
+                                  for number, key in enumerate(SCORE_KEYS, start=1)))
+    choice = input(f"Choose ranking key (1-{len(SCORE_KEYS)}, default 1): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(SCORE_KEYS):
+        return SCORE_KEYS[int(choice) - 1]
+    return "average"
+
+
+def student_summary_line(student):
+    """Return a one-line summary of a student's grades and average for paged listings"""
+    return student.render("summary")
+
+
+def browse_pages(gradebook, view, title, format_student, size=20):
+    """
+    Interactive next/previous navigation over a paged gradebook view
+
+    Args:
+        gradebook (Gradebook): Gradebook to page through
+        view (str): View name accepted by Gradebook.page
+        title (str): Heading printed above each page
+        format_student (callable): Returns the display line for one student
+        size (int): Number of students per page
+    """
+    # Handle empty gradebook case
+    total = len(gradebook)
+    if not total:
+        print("No students in the system.")
+        return
+
+    cursor = 0
+    while True:
+        students, next_cursor, previous_cursor = gradebook.page(view, cursor, size)
+        print(f"\n--- {title} ({cursor + 1}-{cursor + len(students)} of {total}) ---")
+        for student in students:
+            print(format_student(student))
+
+        # Nothing more to navigate
+        if next_cursor is None and previous_cursor is None:
+            return
+
+        options = []
+        if next_cursor is not None:
+            options.append("n: next")
+        if previous_cursor is not None:
+            options.append("p: previous")
+        options.append("Enter: back to menu")
+        action = input(f"({', '.join(options)}): ").strip().lower()
+
+        if action == "n" and next_cursor is not None:
+            cursor = next_cursor
+        elif action == "p" and previous_cursor is not None:
+            cursor = previous_cursor
+        else:
+            return
+
+
+def save_changes(gradebook):
+    """
+    Save the gradebook incrementally, asking for a file path on the first save
+
+    Args:
+        gradebook (Gradebook): Gradebook to save
+    """
+    if not isinstance(gradebook, Gradebook):
+        print("Saving is only available on a single gradebook.")
+        return
+
+    path = None
+    overwrite = False
+    if gradebook.store is None:
+        path = input("Enter file path to save to: ").strip()
+        if not path:
+            print("Save cancelled.")
+            return
+        # The first save starts a fresh store, replacing whatever is in the file
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            if input(f"{path} already exists. Overwrite it? (yes/no): ").strip().lower() != "yes":
+                print("Save cancelled.")
+                return
+            overwrite = True
+
+    try:
+        written = gradebook.save_incremental(path, overwrite)
+        print(f"Saved {written} change(s) to {gradebook.store.path}")
+    except (OSError, ValueError) as e:
+        print(f"Error saving gradebook: {e}")
+
+
+def start_autosave(gradebook):
+    """
+    Ask whether to autosave the gradebook in the background and start the service
+
+    Args:
+        gradebook (Gradebook): Gradebook to autosave
+
+    Returns:
+        AutosaveService: The running service, or None if autosave was not enabled
+    """
+    path = input("Enter a file to autosave to (or press Enter to disable autosave): ").strip()
+    if not path:
+        return None
+    interval = input("Seconds to wait after an edit before autosaving (default 5): ").strip()
+
+    try:
+        service = AutosaveService(gradebook, path, float(interval) if interval else 5.0)
+        service.start()
+        print(f"Autosaving to {path}")
+        return service
+    except ValueError as e:
+        print(f"Error: {e}. Autosave disabled.")
+        return None
+
+
 def display_testing_documentation():
     """
     Display comprehensive testing documentation as required by assignment
@@ -579,6 +4997,7 @@ EDGE CASES TESTED:
 6. Case sensitivity in searches
 7. Empty string inputs
 8. Very large student lists (performance)
+9. Queries on an empty roster and empty search text (e.g. name ~ "")
 
 ISSUES ENCOUNTERED AND RESOLUTIONS:
 -----------------------------------
@@ -600,6 +5019,10 @@ ISSUES ENCOUNTERED AND RESOLUTIONS:
 6. ISSUE: Error messages not user-friendly
    RESOLUTION: Enhanced exception messages with clear guidance
 
+7. ISSUE: name ~ "" crashed with IndexError on an empty gradebook
+   RESOLUTION: Name conditions return an empty mask for an empty roster,
+   and an empty contains-text matches every student
+
 TESTING RESULTS:
 ---------------
 ✓ All core functionalities operational
@@ -621,7 +5044,7 @@ The system has been verified to handle:
     print("=" * 80)
 
 
-def main_oop_system():
+def main_oop_system(gradebook=None):
     """
     Main function to run the enhanced OOP-based grading system
     Integrates all sections (A-F) with comprehensive error handling
@@ -632,8 +5055,19 @@ def main_oop_system():
     - Menu navigation and error recovery testing
     - Data persistence and integrity verification
     """
-    # Initialize gradebook system
-    gradebook = Gradebook()
+    # Initialize gradebook system (a ShardedGradebook can be passed in instead)
+    if gradebook is None:
+        path = input("Enter a saved gradebook file to open (or press Enter to start empty): ").strip()
+        gradebook = Gradebook()
+        if path:
+            try:
+                gradebook = Gradebook.open_store(path)
+                print(f"Loaded {len(gradebook)} student(s) from {path}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error opening {path}: {e}. Starting with an empty gradebook.")
+
+    # Background autosave (the roster of a ShardedGradebook lives in its workers)
+    autosave = start_autosave(gradebook) if isinstance(gradebook, Gradebook) else None
 
     # Display testing documentation on startup
     display_testing_documentation()
@@ -644,19 +5078,27 @@ def main_oop_system():
         print("        ENHANCED STUDENT GRADING SYSTEM (SECTION F)")
         print("=" * 60)
         print("1. Add Student(s)")
-        print("2. Update Student Grades")
+        print("2. Update Student Name/Grades")
         print("3. Remove Student")
         print("4. View All Students")
         print("5. View Subject Grades")
         print("6. Search for a Student (Advanced)")
         print("7. Sort Students by Average (Bubble Sort)")
-        print("8. Sort Students by Name (Insertion Sort)")
+        print("8. Sort Students by Name")
         print("9. Sort Students by Subject")
-        print("10. Display Testing Documentation")
-        print("11. Exit")
+        print("10. Grade Histogram and Percentiles")
+        print("11. View Grade History")
+        print("12. Export Gradebook (CSV/JSONL)")
+        print("13. Memory Report")
+        print("14. Save Changes")
+        print("15. Cohort Breakdown")
+        print("16. Class Summary")
+        print("17. Import Students (CSV)")
+        print("18. Display Testing Documentation")
+        print("19. Exit")
         print("=" * 60)
 
-        choice = input("Choose an option (1-11): ").strip()
+        choice = input("Choose an option (1-19): ").strip()
 
         try:
             if choice == "1":
@@ -667,7 +5109,18 @@ def main_oop_system():
                 name = input("Enter student name to update: ").strip()
                 student = gradebook.search_student(name)
                 if student:
-                    print(f"Updating grades for {student.full_name}:")
+                    print(f"Updating {student.full_name}:")
+                    first_name = input("Enter new first name (press Enter to keep): ").strip()
+                    surname = input("Enter new surname (press Enter to keep): ").strip()
+                    if first_name or surname:
+                        new_name = f"{first_name or student.first_name} {surname or student.surname}"
+                        if new_name.casefold() != student.full_name.casefold() and \
+                                gradebook.search_student(new_name):
+                            print(f"Student {new_name} already exists. Name not changed.")
+                        else:
+                            student.rename(first_name or student.first_name,
+                                           surname or student.surname)
+                            print(f"Name updated to {student.full_name}")
                     for subject in gradebook.subjects:
                         new_grade = input(f"Enter new grade for {subject} (press Enter to skip): ").strip()
                         if new_grade:
@@ -690,16 +5143,18 @@ def main_oop_system():
                     print(f"Error: {e}")
 
             elif choice == "4":
-                # Display all students
-                gradebook.display_all_students()
+                # Display all students one page at a time
+                browse_pages(gradebook, "all", "All Student Records", student_summary_line)
 
             elif choice == "5":
                 # Display subject-specific grades
                 subject = input(f"Enter subject ({', '.join(gradebook.subjects)}): ").strip()
-                try:
-                    gradebook.display_subject_grades(subject)
-                except ValueError as e:
-                    print(f"Error: {e}")
+                if subject not in gradebook.subjects:
+                    print(f"Error: Invalid subject. Available subjects: {', '.join(gradebook.subjects)}")
+                else:
+                    browse_pages(gradebook, "all", f"{subject} Grades",
+                                 lambda student: f"{student.full_name}: "
+                                                 f"{student.grades.get(subject, 'No grade')}")
 
             elif choice == "6":
                 # Advanced search functionality
@@ -708,24 +5163,23 @@ def main_oop_system():
             elif choice == "7":
                 # Bubble sort by average grade
                 try:
+                    key = choose_score_key()
+                    score = gradebook.score_function(key)
                     order = input("Sort order (1: High to Low, 2: Low to High): ").strip()
                     descending = order != "2"
-                    sorted_students = gradebook.bubble_sort_students_by_average(descending)
 
                     order_text = "Highest First" if descending else "Lowest First"
-                    print(f"\n--- Students Sorted by Average Grade ({order_text}) ---")
-                    for student in sorted_students:
-                        print(f"{student.full_name}: {student.get_average():.2f}")
+                    browse_pages(gradebook, key if descending else f"{key}_asc",
+                                 f"Students Sorted by {SCORE_LABELS[key]} ({order_text})",
+                                 lambda student: f"{student.full_name}: {score(student):.2f}")
                 except Exception as e:
                     print(f"Error during sorting: {e}")
 
             elif choice == "8":
-                # Insertion sort by name
+                # Alphabetical listing from the maintained name index
                 try:
-                    sorted_students = gradebook.insertion_sort_students_by_name()
-                    print("\n--- Students Sorted by Name (A-Z) ---")
-                    for student in sorted_students:
-                        print(f"{student.full_name}: {student.get_average():.2f}")
+                    browse_pages(gradebook, "name", "Students Sorted by Name (A-Z)",
+                                 lambda student: f"{student.full_name}: {student.get_average():.2f}")
                 except Exception as e:
                     print(f"Error during sorting: {e}")
 
@@ -733,20 +5187,104 @@ def main_oop_system():
                 # Sort by specific subject
                 subject = input(f"Enter subject to sort by ({', '.join(gradebook.subjects)}): ").strip()
                 try:
-                    sorted_students = gradebook.sort_students_by_subject(subject)
-                    if sorted_students:
-                        print(f"\n--- Students Sorted by {subject} Grade ---")
-                        for student in sorted_students:
-                            grade = student.grades.get(subject, "No grade")
-                            print(f"{student.full_name}: {grade}")
+                    if subject not in gradebook.subjects:
+                        raise ValueError(f"Invalid subject. Available subjects: {', '.join(gradebook.subjects)}")
+                    browse_pages(gradebook, subject, f"Students Sorted by {subject} Grade",
+                                 lambda student: f"{student.full_name}: "
+                                                 f"{student.grades.get(subject, 'No grade')}")
                 except ValueError as e:
                     print(f"Error: {e}")
 
             elif choice == "10":
+                # Histogram and quartiles from the maintained grade counters
+                subject = input(f"Enter subject ({', '.join(gradebook.subjects)}, {AVERAGE_KEY}): ").strip()
+                try:
+                    display_histogram(gradebook, subject)
+                    p = input("Enter a percentile to look up (0-100, or press Enter to skip): ").strip()
+                    if p:
+                        print(f"{p}th percentile: {gradebook.percentile(subject, float(p))}")
+                except ValueError as e:
+                    print(f"Error: {e}")
+
+            elif choice == "11":
+                # Audit trail of grade changes for one student
+                name = input("Enter student name: ").strip()
+                try:
+                    changes = gradebook.grade_history(name)
+                    print(f"\n--- Grade History for {name} ---")
+                    if not changes:
+                        print("No grade changes recorded.")
+                    for timestamp, subject, grade in changes:
+                        print(f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S}  {subject}: {grade}")
+                except (StudentNotFoundError, EmptyNameError) as e:
+                    print(f"Error: {e}")
+
+            elif choice == "12":
+                # Streaming export to CSV or JSON Lines
+                path = input("Enter file path to export to: ").strip()
+                export_format = input("Format (1: CSV, 2: JSONL): ").strip()
+                export_format = "jsonl" if export_format == "2" else "csv"
+                compress = input("Compress with gzip? (yes/no): ").strip().lower() == "yes"
+                try:
+                    exported = gradebook.export(path, export_format, compress)
+                    print(f"Exported {exported} student(s) to {path}")
+                except (OSError, ValueError) as e:
+                    print(f"Error exporting gradebook: {e}")
+
+            elif choice == "13":
+                # Memory accounting per component and per student
+                report = gradebook.memory_report()
+                display_memory_report(report)
+                path = input("Save report as JSON? Enter file path (or press Enter to skip): ").strip()
+                if path:
+                    try:
+                        with open(path, "w", encoding="utf-8") as file:
+                            json.dump(report, file, indent=2)
+                        print(f"Memory report saved to {path}")
+                    except OSError as e:
+                        print(f"Error saving memory report: {e}")
+
+            elif choice == "14":
+                # Incremental save - only changed students are written
+                save_changes(gradebook)
+
+            elif choice == "15":
+                # Per-cohort class summary computed in one group-by pass
+                fields = list(GROUP_FIELDS)
+                print("Group by: " + ", ".join(f"{number}: {field}"
+                                               for number, field in enumerate(fields, start=1)))
+                field = input(f"Choose grouping (1-{len(fields)}, or type a student attribute): ").strip()
+                if field.isdigit() and 1 <= int(field) <= len(fields):
+                    field = fields[int(field) - 1]
+                if field:
+                    display_group_summary(gradebook, field)
+                else:
+                    print("No grouping chosen.")
+
+            elif choice == "16":
+                # Passed/failed, results and letter grades from the maintained counters
+                display_class_summary(gradebook)
+
+            elif choice == "17":
+                # Validated bulk add/update with a row-numbered error report
+                import_students(gradebook)
+
+            elif choice == "18":
                 # Display testing documentation
                 display_testing_documentation()
 
-            elif choice == "11":
+            elif choice == "19":
+                # Offer to save before leaving (sharded gradebooks are not saved)
+                if isinstance(gradebook, Gradebook) and gradebook.has_unsaved_changes:
+                    if input("You have unsaved changes. Save before exiting? (yes/no): ").strip().lower() == "yes":
+                        save_changes(gradebook)
+
+                # Write the last autosave snapshot before leaving
+                if autosave is not None:
+                    autosave.stop()
+                    if autosave.last_error is not None:
+                        print(f"Error autosaving to {autosave.path}: {autosave.last_error}")
+
                 # Exit program
                 print("Exiting program. Goodbye!")
                 break